@@ -1,13 +1,13 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set, Tuple
 from neo4j_manager import Neo4jManager
 
 logger = logging.getLogger(__name__)
 
-
-import logging
-from neo4j_manager import Neo4jManager
-
-logger = logging.getLogger(__name__)
+# Artifacts cover disjoint directory trees, so they are processed concurrently;
+# each worker holds at most one Neo4j session at a time.
+_ARTIFACT_WORKERS = 4
 
 
 class ArtifactDataNormalizer:
@@ -77,119 +77,135 @@ class ArtifactDataNormalizer:
         """
         Validates scanned :Directory:Artifacts. If incorrect, demotes the
         original and promotes the true roots of class hierarchies to be :Artifacts.
+        The class files of all artifacts are read in one query and the label
+        changes for all artifacts are written in one query each.
         """
         logger.info("--- Starting Pass: Relocate Directory Artifacts ---")
         
-        artifacts = self.neo4j_manager.execute_read_query(
-            "MATCH (a:Directory:Artifact) RETURN a.fileName AS fileName"
-        )
-        artifact_files = [record['fileName'] for record in artifacts]
-
-        for artifact_fileName in artifact_files:
-            self._process_single_directory_artifact(artifact_fileName)
-        
-        logger.info("--- Finished Pass: Relocate Directory Artifacts ---")
-
-    def _process_single_directory_artifact(self, artifact_fileName: str):
-        """
-        Validates a single scanned artifact. If it's not a true classpath root,
-        it demotes it and promotes the correct sub-directories.
-        """
-        logger.info(f"Validating potential artifact container: {artifact_fileName}")
-        self.relocated_artifacts_map[artifact_fileName] = []
-        
         query = """
-        MATCH (a:Artifact:Directory {fileName: $artifact_fileName})-[:CONTAINS]->(c:File:Class)
+        MATCH (a:Directory:Artifact)
+        OPTIONAL MATCH (a)-[:CONTAINS]->(c:File:Class)
         WHERE c.fqn IS NOT NULL AND c.fileName IS NOT NULL
-        RETURN c.fqn AS fqn, c.fileName AS path
+        RETURN a.fileName AS fileName, [c IN collect(c) | {fqn: c.fqn, path: c.fileName}] AS classFiles
         """
-        class_files = self.neo4j_manager.execute_read_query(query, params={"artifact_fileName": artifact_fileName})
+        artifacts = self.neo4j_manager.execute_read_query(query)
+
+        demoted_artifacts = []
+        promoted_roots = []
+        fqn_subtrees = []
+        for record in artifacts:
+            artifact_fileName = record['fileName']
+            logger.info(f"Validating potential artifact container: {artifact_fileName}")
+            self.relocated_artifacts_map[artifact_fileName] = []
+
+            class_files = record['classFiles']
+            if not class_files:
+                logger.info(f"No class files found in {artifact_fileName}. Assuming it's not a class artifact.")
+                demoted_artifacts.append(artifact_fileName)
+                continue
+
+            true_artifact_roots = self._find_artifact_roots(class_files)
+
+            original_artifact_relative_path = ""
+            if original_artifact_relative_path in true_artifact_roots and len(true_artifact_roots) == 1:
+                logger.info(f"Artifact '{artifact_fileName}' is correctly labeled. No changes needed.")
+                self.relocated_artifacts_map[artifact_fileName] = [artifact_fileName]
+                fqn_subtrees.append((artifact_fileName, original_artifact_relative_path))
+                continue
+
+            logger.info(f"Relocating artifact label from '{artifact_fileName}'.")
+            demoted_artifacts.append(artifact_fileName)
+            for root_path in true_artifact_roots:
+                promoted_roots.append({"artifact_fileName": artifact_fileName, "root_path": root_path})
+                self.relocated_artifacts_map[artifact_fileName].append(artifact_fileName + root_path)
+                fqn_subtrees.append((artifact_fileName, root_path))
 
-        if not class_files:
-            logger.info(f"No class files found in {artifact_fileName}. Assuming it's not a class artifact.")
+        if demoted_artifacts:
             self.neo4j_manager.execute_write_query(
-                "MATCH (a:Directory {fileName: $fileName}) WHERE a:Artifact REMOVE a:Artifact",
-                params={"fileName": artifact_fileName}
+                """
+                UNWIND $fileNames AS fileName
+                MATCH (a:Directory {fileName: fileName}) WHERE a:Artifact
+                REMOVE a:Artifact
+                """,
+                params={"fileNames": demoted_artifacts}
             )
-            return
 
-        unprocessed_classes = {c['fqn']: c['path'] for c in class_files}
-        true_artifact_roots = set()
+        if promoted_roots:
+            self.neo4j_manager.execute_write_query(
+                """
+                UNWIND $roots AS r
+                MATCH (cont:Directory {fileName: r.artifact_fileName})-[:CONTAINS]->(d:Directory {fileName: r.root_path})
+                SET d:Artifact, d.fileName = d.absolute_path
+                """,
+                params={"roots": promoted_roots}
+            )
+            for root in promoted_roots:
+                logger.info(f"Promoted '{root['root_path']}' to be a new :Artifact and updated its fileName.")
+
+        self._correct_fqns_in_subtrees(fqn_subtrees)
         
-        while unprocessed_classes:
-            anchor_fqn = max(unprocessed_classes.keys(), key=len)
-            anchor_path = unprocessed_classes[anchor_fqn]
+        logger.info("--- Finished Pass: Relocate Directory Artifacts ---")
+
+    def _find_artifact_roots(self, class_files: List[Dict[str, str]]) -> Set[str]:
+        """
+        Returns the classpath roots of an artifact's class files, as paths
+        relative to the artifact: the directories at which each class's
+        package path begins.
+        """
+        class_paths = {c['fqn']: c['path'] for c in class_files}
+        true_artifact_roots = set()
+
+        # Classes are taken as anchors longest FQN first; a class under an
+        # already found root is covered by it and is skipped.
+        for anchor_fqn in sorted(class_paths, key=len, reverse=True):
+            anchor_path = class_paths[anchor_fqn]
+            if any(anchor_path == root or anchor_path.startswith(root + "/") for root in true_artifact_roots):
+                continue
 
             package_parts = anchor_fqn.split('.')[:-1]
             package_as_path = "/" + "/".join(package_parts) if package_parts else ""
-            anchor_dir = "/".join(anchor_path.split('/')[:-1])
+            anchor_dir = anchor_path.rpartition('/')[0]
 
             if not anchor_dir.endswith(package_as_path):
-                del unprocessed_classes[anchor_fqn]
                 continue
 
             artifact_root_path = anchor_dir[:-len(package_as_path)] if package_as_path else anchor_dir
             true_artifact_roots.add(artifact_root_path)
 
-            processed_in_batch = {
-                fqn for fqn, path in unprocessed_classes.items() 
-                if path.startswith(artifact_root_path + "/") or path == artifact_root_path
-            }
-            for fqn in processed_in_batch:
-                del unprocessed_classes[fqn]
-
-        original_artifact_relative_path = ""
-        if original_artifact_relative_path in true_artifact_roots and len(true_artifact_roots) == 1:
-            logger.info(f"Artifact '{artifact_fileName}' is correctly labeled. No changes needed.")
-            self.relocated_artifacts_map[artifact_fileName] = [artifact_fileName]
-            self._correct_fqns_in_subtree(artifact_fileName, original_artifact_relative_path)
-            return
-
-        logger.info(f"Relocating artifact label from '{artifact_fileName}'.")
-        self.neo4j_manager.execute_write_query(
-            "MATCH (a:Directory {fileName: $fileName}) WHERE a:Artifact REMOVE a:Artifact",
-            params={"fileName": artifact_fileName}
-        )
+        return true_artifact_roots
 
-        for root_path in true_artifact_roots:
-            # Pre-calculate the absolute path of the node to be promoted.
-            new_artifact_absolute_path = artifact_fileName + root_path
-            
-            self.neo4j_manager.execute_write_query(
-                """
-                MATCH (cont:Directory {fileName: $artifact_fileName})-[:CONTAINS]->(d:Directory {fileName: $root_path})
-                SET d:Artifact, d.fileName = d.absolute_path
-                """,
-                params={"artifact_fileName": artifact_fileName, "root_path": root_path}
-            )
-            logger.info(f"Promoted '{root_path}' to be a new :Artifact and updated its fileName.")
-            self.relocated_artifacts_map[artifact_fileName].append(new_artifact_absolute_path)
-            self._correct_fqns_in_subtree(artifact_fileName, root_path)
+    def _correct_fqns_in_subtrees(self, subtrees: List[Tuple[str, str]]):
+        """
+        Sets correct FQNs for all directories under new Artifact roots, given as
+        (container fileName, root path) pairs. All subtrees are read with one
+        query and updated with one query.
+        """
+        if not subtrees:
+            return
 
-    def _correct_fqns_in_subtree(self, container_fileName: str, root_path: str):
-        """Helper to set correct FQNs for all directories under a new Artifact root."""
         query = """
-        MATCH (cont:Directory {fileName: $container_fileName})-[:CONTAINS]->(d:Directory)
-        WHERE d.fileName STARTS WITH $root_path
-        RETURN d.fileName as path
+        UNWIND $roots AS r
+        MATCH (cont:Directory {fileName: r.container_fileName})-[:CONTAINS]->(d:Directory)
+        WHERE d.fileName STARTS WITH r.root_path
+        RETURN r.container_fileName AS container_fileName, r.root_path AS root_path, d.fileName AS path
         """
-        dirs_in_tree = self.neo4j_manager.execute_read_query(query, params={"container_fileName": container_fileName, "root_path": root_path})
+        roots = [{"container_fileName": container, "root_path": root_path} for container, root_path in subtrees]
+        dirs_in_trees = self.neo4j_manager.execute_read_query_tuples(query, params={"roots": roots})
 
         update_params = []
-        for record in dirs_in_tree:
-            dir_path = record['path']
+        for container_fileName, root_path, dir_path in dirs_in_trees:
             if len(dir_path) > len(root_path):
                 relative_path = dir_path[len(root_path) + 1:]
                 correct_fqn = relative_path.replace('/', '.')
-                update_params.append({"path": dir_path, "fqn": correct_fqn})
+                update_params.append({"container_fileName": container_fileName, "path": dir_path, "fqn": correct_fqn})
 
         if update_params:
             update_query = """
             UNWIND $params AS p
-            MATCH (cont:Directory {fileName: $container_fileName})-[:CONTAINS]->(d:Directory {fileName: p.path})
+            MATCH (cont:Directory {fileName: p.container_fileName})-[:CONTAINS]->(d:Directory {fileName: p.path})
             SET d.fqn = p.fqn
             """
-            self.neo4j_manager.execute_write_query(update_query, params={"container_fileName": container_fileName, "params": update_params})
+            self.neo4j_manager.execute_write_query(update_query, params={"params": update_params})
 
     def rewrite_containment_relationships(self):
         """
@@ -217,16 +233,22 @@ class ArtifactDataNormalizer:
             logger.info("--- Finished Pass: Rewrite Containment Relationships ---")
             return
 
-        for file_name in demoted_roots:
-            # Only run cleanup if new artifacts were actually promoted inside
-            if self.relocated_artifacts_map.get(file_name):
-                delete_query = """
-                MATCH (demotedRoot {fileName: $fileName})-[r:CONTAINS]->(descendant)
-                WHERE demotedRoot.absolute_path IS NOT NULL AND descendant.absolute_path IS NOT NULL
-                AND size(split(descendant.absolute_path, '/')) > size(split(demotedRoot.absolute_path, '/')) + 1
-                DELETE r
-                """
-                self.neo4j_manager.execute_write_query(delete_query, params={"fileName": file_name})
+        # Only run cleanup if new artifacts were actually promoted inside
+        cleanup_roots = [file_name for file_name in demoted_roots if self.relocated_artifacts_map.get(file_name)]
+        if cleanup_roots:
+            # The root's depth is computed once per root, not once per descendant
+            delete_query = """
+            UNWIND $fileNames AS fileName
+            MATCH (demotedRoot {fileName: fileName})
+            WHERE demotedRoot.absolute_path IS NOT NULL
+            WITH demotedRoot, size(split(demotedRoot.absolute_path, '/')) + 1 AS childDepth
+            MATCH (demotedRoot)-[r:CONTAINS]->(descendant)
+            WHERE descendant.absolute_path IS NOT NULL
+            AND size(split(descendant.absolute_path, '/')) > childDepth
+            DELETE r
+            """
+            self.neo4j_manager.execute_write_query(delete_query, params={"fileNames": cleanup_roots})
+            for file_name in cleanup_roots:
                 logger.info(f"Cleaned up transitive relationships for demoted root: {file_name}")
 
         logger.info("--- Finished Pass: Rewrite Containment Relationships ---")
@@ -294,58 +316,59 @@ class ArtifactDataNormalizer:
         for record in jar_artifacts:
             all_artifact_paths.add(record['path'])
 
-        for path in all_artifact_paths:
-            self._establish_class_hierarchy_in_single_artifact(path)
+        with ThreadPoolExecutor(max_workers=_ARTIFACT_WORKERS) as executor:
+            list(executor.map(self._establish_class_hierarchy_in_single_artifact, all_artifact_paths))
          
         logger.info("Established [:CONTAINS_CLASS] relationships.")
         logger.info("--- Finished Pass: Establish Class Hierarchy ---")
 
     def _establish_class_hierarchy_in_single_artifact(self, artifact_path: str):
-        """Builds the [:CONTAINS_CLASS] hierarchy within a single artifact."""
-        from collections import defaultdict
+        """
+        Builds the [:CONTAINS_CLASS] hierarchy within a single artifact. The
+        parent of every directory and class file is derived from its path in
+        Python, so each kind of edge is written with a single query.
+        """
         logger.info(f"Building class hierarchy for artifact: {artifact_path}")
 
-        # Get all directories in the artifact
+        # Get all directories and class files in the artifact
         query = """
-        MATCH (a:Artifact {fileName: $artifact_path})-[:CONTAINS]->(d:Directory)
-        WHERE d.fileName IS NOT NULL
-        RETURN DISTINCT d.fileName AS path, size(split(d.fileName, '/')) AS depth
+        MATCH (a:Artifact {fileName: $artifact_path})-[:CONTAINS]->(n)
+        WHERE n.fileName IS NOT NULL AND (n:Directory OR (n:Type AND n:File))
+        RETURN DISTINCT n.fileName AS path, n:Directory AS isDirectory
         """
-        nodes_with_depth = self.neo4j_manager.execute_read_query(query, params={"artifact_path": artifact_path})
+        nodes = self.neo4j_manager.execute_read_query_tuples(query, params={"artifact_path": artifact_path})
+        dir_paths = {path for path, is_directory in nodes if is_directory}
 
-        # Link class files to their parent directories
-        self.neo4j_manager.execute_write_query(
-            """
-            UNWIND $paths AS dir_path
-            MATCH (parentDir:Directory {fileName: dir_path})
-            MATCH (a:Artifact {fileName: $artifact_path})-[:CONTAINS]->(parentDir)
-            MATCH (a)-[:CONTAINS]->(t:Type:File)
-            WHERE t.fileName STARTS WITH parentDir.fileName + '/'
-            AND size(split(t.fileName, '/')) = size(split(parentDir.fileName, '/')) + 1
-            MERGE (parentDir)-[:CONTAINS_CLASS]->(t)
-            """,
-            params={"paths": [item['path'] for item in nodes_with_depth], "artifact_path": artifact_path}
-        )
+        # A node's parent is the directory one path segment up, if the artifact has it
+        file_edges = []
+        dir_edges = []
+        for path, is_directory in nodes:
+            parent_path = path.rpartition('/')[0]
+            if parent_path in dir_paths:
+                (dir_edges if is_directory else file_edges).append({"parent": parent_path, "child": path})
 
-        # Link directories to their parent directories by depth
-        nodes_by_depth = defaultdict(list)
-        for item in nodes_with_depth:
-            nodes_by_depth[item['depth']].append(item['path'])
+        # Link class files to their parent directories
+        if file_edges:
+            self.neo4j_manager.execute_write_query(
+                """
+                UNWIND $edges AS e
+                MATCH (a:Artifact {fileName: $artifact_path})-[:CONTAINS]->(parentDir:Directory {fileName: e.parent})
+                MATCH (a)-[:CONTAINS]->(t:Type:File {fileName: e.child})
+                MERGE (parentDir)-[:CONTAINS_CLASS]->(t)
+                """,
+                params={"edges": file_edges, "artifact_path": artifact_path}
+            )
 
-        for depth in sorted(nodes_by_depth.keys(), reverse=True):
-            current_depth_paths = nodes_by_depth[depth]
+        # Link directories to their parent directories
+        if dir_edges:
             self.neo4j_manager.execute_write_query(
                 """
-                UNWIND $paths AS parent_path
-                MATCH (parentDir:Directory {fileName: parent_path})
-                MATCH (a:Artifact {fileName: $artifact_path})-[:CONTAINS]->(parentDir)
-                MATCH (childDir:Directory)
-                WHERE childDir.fileName STARTS WITH parentDir.fileName + '/'
-                  AND size(split(childDir.fileName, '/')) = size(split(parentDir.fileName, '/')) + 1
-                  AND (parentDir)-[:CONTAINS]->(childDir)
+                UNWIND $edges AS e
+                MATCH (a:Artifact {fileName: $artifact_path})-[:CONTAINS]->(parentDir:Directory {fileName: e.parent})
+                MATCH (parentDir)-[:CONTAINS]->(childDir:Directory {fileName: e.child})
                 MERGE (parentDir)-[:CONTAINS_CLASS]->(childDir)
                 """,
-                params={"paths": current_depth_paths, "artifact_path": artifact_path}
+                params={"edges": dir_edges, "artifact_path": artifact_path}
             )
 
         # Link the Artifact node to its direct children
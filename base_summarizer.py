@@ -13,10 +13,15 @@ class BaseSummarizer(ABC):
     Abstract base class for summarization passes. Implements the Template Method
     pattern for processing batches of items.
     """
-    def __init__(self, neo4j_manager: Neo4jManager, node_summary_processor: NodeSummaryProcessor, num_workers: int = 8):
+    # Number of updates sent per UNWIND write
+    write_batch_size: int = 500
+
+    def __init__(self, neo4j_manager: Neo4jManager, node_summary_processor: NodeSummaryProcessor, num_workers: Optional[int] = None):
         self.neo4j_manager = neo4j_manager
         self.node_summary_processor = node_summary_processor
-        self.num_workers = num_workers
+        # Each worker has at most one LLM request in flight, so by default the
+        # number of workers matches the concurrency the LLM client allows
+        self.num_workers = num_workers or node_summary_processor.llm_client.batch_max_workers
         logger.info(f"Initialized {self.__class__.__name__} with {self.num_workers} workers.")
 
     @abstractmethod
@@ -44,6 +49,32 @@ class BaseSummarizer(ABC):
         """
         return item
 
+    def _get_dependency_ids(self, item: Dict[str, Any]) -> Optional[List[str]]:
+        """
+        Returns the ids of the nodes whose regeneration makes this item's summary
+        stale, or None if the pass does not track staleness. By default these are
+        the item's 'dependency_ids'.
+        """
+        return item.get('dependency_ids')
+
+    def _mark_stale_items(self, items_to_process: List[Dict[str, Any]]):
+        """
+        Sets 'is_stale' on every item that has dependencies, using one bulk check.
+        Items of a batch never depend on each other, so the outcome cannot change
+        while the batch is processed.
+        """
+        node_to_deps = {}
+        for item in items_to_process:
+            dependency_ids = self._get_dependency_ids(item)
+            if dependency_ids is not None:
+                node_to_deps[item['id']] = dependency_ids
+        if not node_to_deps:
+            return
+        stale_map = self.node_summary_processor.cache_manager.was_any_dependency_changed_bulk(node_to_deps)
+        for item in items_to_process:
+            if item['id'] in stale_map:
+                item['is_stale'] = stale_map[item['id']]
+
     def _handle_result(self, result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
         Handles the result from the NodeSummaryProcessor, updating caches and runtime status.
@@ -80,15 +111,22 @@ class BaseSummarizer(ABC):
     def process_batch(self, items_to_process: List[Dict[str, Any]]) -> int:
         """
         Processes a given list of items in parallel using the template method.
+        Updates are written in chunks of write_batch_size on a separate writer
+        thread, so database writes overlap with the processing of later items.
         """
         if not items_to_process:
             return 0
 
         class_name = self.__class__.__name__
         logger.info(f"Processing batch of {len(items_to_process)} items for {class_name}.")
+        self._mark_stale_items(items_to_process)
         
         updates = []
-        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+        write_futures = []
+        # One session serves every chunk of this batch; only the single writer thread uses it
+        with self.neo4j_manager.session_scope() as session, \
+                ThreadPoolExecutor(max_workers=1) as writer, \
+                ThreadPoolExecutor(max_workers=self.num_workers) as executor:
             futures = {executor.submit(self._process_and_handle_item, item): item for item in items_to_process}
             
             for future in tqdm(as_completed(futures), total=len(items_to_process), desc=f"Processing {class_name} batch"):
@@ -96,17 +134,30 @@ class BaseSummarizer(ABC):
                     update_data = future.result()
                     if update_data:
                         updates.append(update_data)
+                        if len(updates) >= self.write_batch_size:
+                            write_futures.append(writer.submit(self._write_updates, session, updates))
+                            updates = []
                 except Exception as e:
                     item = futures[future]
                     logger.error(f"Error processing item {item.get('id', 'N/A')} in {class_name}: {e}", exc_info=True)
 
-        if not updates:
-            logger.warning(f"No database updates generated for this batch in {class_name}.")
-            return 0
+            if updates:
+                write_futures.append(writer.submit(self._write_updates, session, updates))
+
+            if not write_futures:
+                logger.warning(f"No database updates generated for this batch in {class_name}.")
+                return 0
+
+            # All writes must land before returning; later passes read these properties
+            properties_set = sum(future.result() for future in write_futures)
 
-        update_query = self._get_update_query()
-        summary_counters = self.neo4j_manager.execute_write_query(update_query, params={"updates": updates})
-        
-        properties_set = summary_counters.properties_set if summary_counters else 0
         logger.info(f"Batch complete for {class_name}. Updated {properties_set} properties.")
         return properties_set
+
+    def _write_updates(self, session, updates: List[Dict[str, Any]]) -> int:
+        """
+        Writes one chunk of updates with the subclass's UNWIND update query,
+        as one transaction on the batch's session.
+        """
+        summary_counters = self.neo4j_manager.execute_write_tx(session, self._get_update_query(), params={"updates": updates})
+        return summary_counters.properties_set if summary_counters else 0
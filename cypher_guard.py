@@ -0,0 +1,25 @@
+import re
+from typing import Optional
+
+# Keyword checks for read-only Cypher, compiled once at import
+_READ_RE = re.compile(r'\b(?:MATCH|OPTIONAL\s+MATCH|WHERE|RETURN|UNWIND|CALL|WITH)\b', re.IGNORECASE)
+_WRITE_RE = re.compile(r'\b(?:CREATE|SET|DELETE|MERGE|REMOVE|DETACH)\b', re.IGNORECASE)
+# Backtick-quoted identifiers, string literals and comments are blanked out so keywords
+# inside them are not matched. Identifiers come first: a quote inside one is not a string.
+_LITERALS_AND_COMMENTS_RE = re.compile(
+    r"`(?:[^`]|``)*`|'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|//[^\n]*|/\*.*?\*/", re.DOTALL
+)
+
+
+def check_read_only_cypher(query: str) -> Optional[str]:
+    """
+    Returns an error message if the query is not a read-only Cypher query, or None
+    if it may be run. This is a first line of defense; callers should still run
+    the query in a read transaction so the server rejects any write.
+    """
+    code = _LITERALS_AND_COMMENTS_RE.sub(" ", query)
+    if not _READ_RE.search(code):
+        return "Query must contain a read-only keyword."
+    if _WRITE_RE.search(code):
+        return "Write operations are not allowed."
+    return None
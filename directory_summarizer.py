@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List
 from base_summarizer import BaseSummarizer
 from node_summary_processor import NodeSummaryProcessor
 from neo4j_manager import Neo4jManager
@@ -27,16 +27,15 @@ class DirectorySummarizer(BaseSummarizer):
         """
         logger.info(f"--- Starting Pass: {self.__class__.__name__} ---")
 
-        all_directories_with_depth = self._get_directories_ordered_by_depth()
-        if not all_directories_with_depth:
+        # Group directories by depth, the number of segments in their path,
+        # as the driver yields them
+        directories_by_depth = defaultdict(list)
+        for item in self._get_directories():
+            directories_by_depth[item['path'].count('/') + 1].append(item)
+        if not directories_by_depth:
             logger.info("No directories found to process.")
             return 0
 
-        # Group directories by depth
-        directories_by_depth = defaultdict(list)
-        for item in all_directories_with_depth:
-            directories_by_depth[item['depth']].append(item)
-
         total_updated_count = 0
         # Process levels from deepest to shallowest
         for depth in sorted(directories_by_depth.keys(), reverse=True):
@@ -53,15 +52,14 @@ class DirectorySummarizer(BaseSummarizer):
         )
         return total_updated_count
 
-    def _get_directories_ordered_by_depth(self) -> List[Dict[str, Any]]:
+    def _get_directories(self) -> Iterator[Dict[str, Any]]:
         """
-        Fetches all directories, ordered from deepest to shallowest, along
-        with the context of their direct children and their depth.
+        Fetches all directories along with the context of their direct
+        children. The caller orders them by depth.
         """
         query = """
         MATCH (d:Directory)
         WHERE d.absolute_path IS NOT NULL
-        WITH d, size(split(d.absolute_path, '/')) AS depth
         // Gather context from direct children
         OPTIONAL MATCH (d)-[:CONTAINS_SOURCE]->(child)
         WHERE child:SourceFile OR child:Directory
@@ -69,16 +67,14 @@ class DirectorySummarizer(BaseSummarizer):
             d.entity_id AS id,
             d.absolute_path AS path,
             d.summary AS db_summary,
-            collect(DISTINCT child.entity_id) AS dependency_ids,
-            depth
-        ORDER BY depth DESC
+            collect(DISTINCT child.entity_id) AS dependency_ids
         """
-        return self.neo4j_manager.execute_read_query(query)
+        return self.neo4j_manager.stream_read_query(query)
 
     def _get_update_query(self) -> str:
         return """
         UNWIND $updates AS item
-        MATCH (d:Directory {entity_id: item.id})
+        MATCH (d:Entity:Directory {entity_id: item.id})
         SET d.summary = item.summary
         """
 
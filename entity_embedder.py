@@ -56,9 +56,10 @@ class EntityEmbedder:
                 node_summaries
             )
 
+            # Convert the whole 2D array to lists once, at parameter-binding time
             updates = [
                 {"id": node_id, "embedding": emb}
-                for node_id, emb in zip(node_ids, embeddings)
+                for node_id, emb in zip(node_ids, embeddings.tolist())
             ]
 
             # Update the embeddings for the current batch in the database
@@ -88,7 +89,8 @@ class EntityEmbedder:
             FOR (e:Entity) ON (e.summaryEmbedding)
             OPTIONS {indexConfig: {
                 `vector.dimensions`: 384,
-                `vector.similarity_function`: 'cosine'
+                `vector.similarity_function`: 'cosine',
+                `vector.quantization.enabled`: true
             }}
             """
         )
@@ -104,15 +104,21 @@ class GraphBasicNormalizer:
     def label_source_files(self):
         """
         Identifies and labels :File nodes that represent Java or Kotlin
-        source code files as :SourceFile.
+        source code files as :SourceFile, and records their 'language'
+        ('java' or 'kotlin') as an indexed property so the source parsers
+        can select their files without a suffix scan.
         This pass relies on 'absolute_path' having been set previously.
         """
         logger.info("--- Starting Pass: Label Source Files ---")
+        self.neo4j_manager.execute_write_query(
+            "CREATE INDEX source_file_language IF NOT EXISTS FOR (f:SourceFile) ON (f.language)"
+        )
         query = """
         MATCH (f:File)
         WHERE f.absolute_path IS NOT NULL
         AND (f.absolute_path ENDS WITH '.java' OR f.absolute_path ENDS WITH '.kt')
-        SET f:SourceFile
+        SET f:SourceFile,
+            f.language = CASE WHEN f.absolute_path ENDS WITH '.kt' THEN 'kotlin' ELSE 'java' END
         RETURN count(f) AS source_files_labeled
         """
         result = self.neo4j_manager.execute_write_query(query)
@@ -16,6 +16,7 @@ class GraphTreeBuilder:
     def __init__(self, neo4j_manager: Neo4jManager):
         self.neo4j_manager = neo4j_manager
         self.project_path = None
+        self.project_path_is_dir = False
         self.project_name = None
         logger.info("Initialized GraphTreeBuilder.")
 
@@ -41,6 +42,10 @@ class GraphTreeBuilder:
         self.project_path = Path(project_path_str).resolve()
         self.project_name = self.project_path.name
         logger.info(f"Auto-detected project path: {self.project_path}")
+        # Probed once; the graph can still be built when the source tree is not on disk
+        self.project_path_is_dir = self.project_path.is_dir()
+        if not self.project_path_is_dir:
+            logger.warning(f"Project path {self.project_path} is not a directory on disk; source files will not be readable.")
 
         # 2. Create :Project node and link artifacts
         self.neo4j_manager.execute_write_query("""
@@ -10,6 +10,14 @@ def add_neo4j_args(parser: argparse.ArgumentParser):
                        help="Neo4j username (default: neo4j or NEO4J_USER env var)")
     group.add_argument("--password", default=os.getenv("NEO4J_PASSWORD", "neo4j"),
                        help="Neo4j password (default: neo4j or NEO4J_PASSWORD env var)")
+    group.add_argument("--database", default=os.getenv("NEO4J_DATABASE"),
+                       help="Neo4j database to target (default: the server's default database or NEO4J_DATABASE env var)")
+    group.add_argument("--pool-size", type=int, default=50,
+                       help="Maximum number of pooled Neo4j connections (default: 50)")
+    group.add_argument("--acquisition-timeout", type=float, default=30.0,
+                       help="Seconds to wait for a pooled Neo4j connection (default: 30)")
+    group.add_argument("--max-lifetime", type=float, default=3600.0,
+                       help="Seconds after which a pooled Neo4j connection is replaced (default: 3600)")
 
 def add_logging_args(parser: argparse.ArgumentParser):
     """Adds logging related arguments to the parser."""
@@ -1,21 +1,47 @@
 import os
+import re
 import logging
 from typing import List, Dict, Any, Tuple
 from pathlib import Path
 from neo4j_manager import Neo4jManager # New import
+from source_file_metadata import FileMetadata
 
 # Tree-sitter imports
 try:
-    from tree_sitter import Language, Parser
+    from tree_sitter import Language, Parser, Query, QueryCursor
     import tree_sitter_java
     JAVA_LANGUAGE = Language(tree_sitter_java.language())
     _parser = Parser(JAVA_LANGUAGE)
+    # Top-level declarations only; evaluated in C in a single pass over the tree.
+    _JAVA_QUERY = Query(JAVA_LANGUAGE, """
+    (program (package_declaration (scoped_identifier) @package))
+    (program
+      [(class_declaration name: (identifier) @type)
+       (interface_declaration name: (identifier) @type)
+       (enum_declaration name: (identifier) @type)
+       (annotation_type_declaration name: (identifier) @type)
+       (record_declaration name: (identifier) @type)])
+    (program (module_declaration name: (_) @module))
+    """)
 except ImportError:
     logging.getLogger(__name__).warning("tree-sitter-java not installed. Java parsing will be disabled.")
     _parser = None
 
 logger = logging.getLogger(__name__)
 
+# package-info.java and module-info.java only carry a header declaration, so a
+# regex is enough; annotations may precede the keyword.
+_ANNOTATIONS = rb"(?:@[\w.]+(?:\([^)]*\))?\s*)*"
+_PACKAGE_INFO_RE = re.compile(rb"(?m)^\s*" + _ANNOTATIONS + rb"package\s+([\w.]+)\s*;")
+_MODULE_INFO_RE = re.compile(rb"(?m)^\s*" + _ANNOTATIONS + rb"(?:open\s+)?module\s+([\w.]+)\s*\{")
+
+
+def _node_text(content: bytes, node) -> str:
+    """Decodes a node's source text by slicing the file buffer already in hand."""
+    raw = content[node.start_byte:node.end_byte]
+    # Identifiers are almost always ASCII, which decodes without the UTF-8 state machine
+    return raw.decode("ascii") if raw.isascii() else raw.decode("utf-8")
+
 class JavaSourceParser:
     """
     Parses Java source files to extract metadata like package name and top-level classes.
@@ -26,68 +52,47 @@ class JavaSourceParser:
         self.neo4j_manager = neo4j_manager # Store neo4j_manager
         logger.info("Initialized JavaSourceParser.")
 
-    def _get_java_file_metadata(self, absolute_disk_path: str) -> Dict[str, Any]:
+    def _get_java_file_metadata(self, absolute_disk_path: str) -> FileMetadata:
         """
-        Parses a .java file using tree-sitter and returns a dictionary with package and top-level types (FQNs).
+        Parses a .java file using tree-sitter and returns a FileMetadata record with package and top-level types (FQNs).
         """
         try:
             with open(absolute_disk_path, "rb") as f: # Read as binary for tree-sitter
                 content = f.read()
 
-            tree = _parser.parse(content)
-            root = tree.root_node
+            file_name = os.path.basename(absolute_disk_path)
+            if file_name == "package-info.java":
+                match = _PACKAGE_INFO_RE.search(content)
+                package_name = match.group(1).decode("utf-8") if match else ""
+                return FileMetadata(path=absolute_disk_path, package=package_name, fqns=[package_name] if package_name else [])
+            if file_name == "module-info.java":
+                match = _MODULE_INFO_RE.search(content)
+                return FileMetadata(path=absolute_disk_path, fqns=[match.group(1).decode("utf-8")] if match else [])
 
-            package_name = ""
-            found_types_with_kind = []
-
-            for child in root.children:
-                if child.type == "package_declaration":
-                    for node in child.children:
-                        if node.type == "scoped_identifier":
-                            package_name = node.text.decode("utf-8")
-                            break
-                elif child.type in ["class_declaration", "interface_declaration", "enum_declaration", "annotation_type_declaration", "record_declaration"]:
-                    name_node = child.child_by_field_name("name")
-                    if name_node:
-                        found_types_with_kind.append((name_node.text.decode("utf-8"), child.type))
-                elif child.type == "module_declaration":
-                    name_node = child.child_by_field_name("name")
-                    if name_node:
-                        found_types_with_kind.append((name_node.text.decode("utf-8"), child.type))
+            tree = _parser.parse(content)
+            captures = QueryCursor(_JAVA_QUERY).captures(tree.root_node)
 
-            fqns = []
+            package_nodes = captures.get("package")
+            package_name = _node_text(content, package_nodes[0]) if package_nodes else ""
             prefix = f"{package_name}." if package_name else ""
 
-            for type_name, kind in found_types_with_kind:
-                if kind == "module_declaration":
-                    fqns.append(type_name)
-                else:
-                    fqns.append(f"{prefix}{type_name}")
-
-            if Path(absolute_disk_path).name == "package-info.java" and package_name and package_name not in fqns:
-                fqns.append(package_name)
+            # Alternation branches are captured per pattern; restore source order
+            type_nodes = sorted(captures.get("type", []), key=lambda node: node.start_byte)
+            fqns = [f"{prefix}{_node_text(content, node)}" for node in type_nodes]
+            # Module names are already fully qualified
+            fqns.extend(_node_text(content, node) for node in captures.get("module", []))
 
-            return {
-                "path": absolute_disk_path,
-                "package": package_name,
-                "fqns": fqns
-            }
+            return FileMetadata(path=absolute_disk_path, package=package_name, fqns=fqns)
         except Exception as e:
             logger.error(f"Error reading or processing Java file {absolute_disk_path}: {e}")
-            return {
-                "path": absolute_disk_path,
-                "package": "",
-                "fqns": [],
-                "error": str(e)
-            }
+            return FileMetadata(path=absolute_disk_path, error=str(e))
 
-    def parse_project(self) -> List[Dict[str, Any]]: # Modified signature and logic
+    def parse_project(self) -> List[FileMetadata]: # Modified signature and logic
         """
         Queries Neo4j for Java source files, parses them, and returns their metadata.
         """
         query = """
-        MATCH (f:SourceFile)
-        WHERE f.absolute_path ENDS WITH '.java'
+        MATCH (f:SourceFile {language: 'java'})
         RETURN f.absolute_path AS absolutePath
         """
         java_files_in_graph = self.neo4j_manager.execute_read_query(query)
@@ -1,20 +1,130 @@
 import os
+import json
+import hashlib
+import functools
 import logging
-from typing import List, Dict, Any, Tuple
+import mmap
+import multiprocessing
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from itertools import tee
+from operator import attrgetter
+from typing import List, Dict, Any, Optional, Tuple, Union
 from pathlib import Path
 from neo4j_manager import Neo4jManager # New import
+from log_manager import get_log_queue, init_worker_logging
+from source_file_metadata import FileMetadata
+
+# Top-level declarations only; evaluated in C in a single pass over the tree.
+# Interfaces and annotation classes are parsed as class_declaration by this grammar.
+_KOTLIN_QUERY_SOURCE = """
+(source_file (package_header (qualified_identifier) @package))
+(source_file
+  [(class_declaration name: (_) @type)
+   (object_declaration name: (_) @type)])
+(source_file [(function_declaration) (property_declaration)] @member)
+"""
 
-# Tree-sitter imports
-try:
-    from tree_sitter import Language, Parser
+logger = logging.getLogger(__name__)
+
+# Parsed metadata is cached across runs and invalidated by a content hash mismatch.
+_PARSE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "jqa-rag", "kt_parse.sqlite")
+
+# Files at least this large are memory-mapped rather than copied into a bytes object.
+_MMAP_THRESHOLD = 4096
+
+_by_start_byte = attrgetter("start_byte")
+
+# Parse input: a bytes copy for small files, a read-only mapping for large ones
+SourceBuffer = Union[bytes, mmap.mmap]
+
+
+# Tree-sitter objects are built lazily, once per process, so importing this module
+# (e.g. for commands that never parse Kotlin) does not load the grammar.
+@functools.cache
+def _get_language() -> Any:
+    from tree_sitter import Language
     import tree_sitter_kotlin
-    KOTLIN_LANGUAGE = Language(tree_sitter_kotlin.language())
-    _parser = Parser(KOTLIN_LANGUAGE)
-except ImportError:
-    logging.getLogger(__name__).warning("tree-sitter-kotlin not installed. Kotlin parsing will be disabled.")
-    _parser = None
+    return Language(tree_sitter_kotlin.language())
+
+
+@functools.cache
+def _get_parser() -> Any:
+    from tree_sitter import Parser
+    return Parser(_get_language())
+
+
+@functools.cache
+def _get_query_cursor() -> Any:
+    from tree_sitter import Query, QueryCursor
+    return QueryCursor(Query(_get_language(), _KOTLIN_QUERY_SOURCE))
+
+
+def _init_worker(log_queue: Any) -> None:
+    """Process pool initializer: sets up logging and builds the parser before the first task."""
+    init_worker_logging(log_queue)
+    _get_parser()
+    _get_query_cursor()
+
+
+def _node_text(content: SourceBuffer, node: Any) -> str:
+    """Decodes a node's source text by slicing the file buffer already in hand."""
+    raw = content[node.start_byte:node.end_byte]
+    # Identifiers are almost always ASCII, which decodes without the UTF-8 state machine
+    return raw.decode("ascii") if raw.isascii() else raw.decode("utf-8")
+
+
+def _extract_kotlin_metadata(absolute_disk_path: str, content: SourceBuffer, cached_sha: Optional[str]) -> Tuple[str, Optional[FileMetadata]]:
+    """
+    Hashes and parses the file content (bytes or a read-only mmap). All node text
+    is sliced out before returning, so the caller may close the mapping afterwards.
+    """
+    sha: str = hashlib.sha256(content).hexdigest()
+    if sha == cached_sha:
+        return sha, None
+
+    tree = _get_parser().parse(content)
+    captures: Dict[str, List[Any]] = _get_query_cursor().captures(tree.root_node)
+
+    package_nodes = captures.get("package")
+    package_name: str = _node_text(content, package_nodes[0]) if package_nodes else ""
+    prefix: str = f"{package_name}." if package_name else ""
+
+    # Alternation branches are captured per pattern; restore source order.
+    # fqns is a dict used as an insertion-ordered set.
+    type_nodes = sorted(captures.get("type", []), key=_by_start_byte)
+    fqns: Dict[str, None] = dict.fromkeys(f"{prefix}{_node_text(content, node)}" for node in type_nodes)
+
+    # Top-level functions/properties are compiled into a synthetic "<File>Kt" class
+    if "member" in captures:
+        base_name = os.path.splitext(os.path.basename(absolute_disk_path))[0]
+        virtual_class_simple_name = f"{base_name.capitalize()}Kt"
+        fqns[f"{prefix}{virtual_class_simple_name}"] = None
+
+    if package_name:
+        fqns[package_name] = None
+
+    return sha, FileMetadata(path=absolute_disk_path, package=package_name, fqns=list(fqns))
+
+
+def _get_kotlin_file_metadata(absolute_disk_path: str, cached_sha: Optional[str] = None) -> Tuple[Optional[str], Optional[FileMetadata]]:
+    """
+    Parses a .kt file and returns its content hash and a FileMetadata record with
+    package and top-level types (FQNs). Handles Kotlin's synthetic "Kt" class naming convention.
+    If the content hash equals cached_sha, parsing is skipped and the metadata is None.
+    Defined at module level so it can be dispatched to worker processes.
+    """
+    try:
+        with open(absolute_disk_path, "rb") as f: # Read as binary for tree-sitter
+            if os.fstat(f.fileno()).st_size < _MMAP_THRESHOLD:
+                return _extract_kotlin_metadata(absolute_disk_path, f.read(), cached_sha)
+            # tree-sitter and hashlib both accept the mapping directly, avoiding a copy
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                return _extract_kotlin_metadata(absolute_disk_path, content, cached_sha)
+    except Exception as e:
+        logger.error(f"Error reading or processing Kotlin file {absolute_disk_path}: {e}")
+        return None, FileMetadata(path=absolute_disk_path, error=str(e))
 
-logger = logging.getLogger(__name__)
 
 class KotlinSourceParser:
     """
@@ -22,87 +132,98 @@ class KotlinSourceParser:
     including synthetic "Kt" classes for top-level functions/properties.
     """
     def __init__(self, neo4j_manager: Neo4jManager): # Modified signature
-        if _parser is None:
+        try:
+            _get_parser()
+        except ImportError:
             raise ImportError("tree-sitter-kotlin is required for Kotlin parsing but not installed.")
         self.neo4j_manager = neo4j_manager # Store neo4j_manager
+        self._cache_conn = self._open_parse_cache()
         logger.info("Initialized KotlinSourceParser.")
 
-    def _get_kotlin_file_metadata(self, absolute_disk_path: str) -> Dict[str, Any]:
+    def _open_parse_cache(self) -> Optional[sqlite3.Connection]:
         """
-        Parses a .kt file and returns a dictionary with package and top-level types (FQNs).
-        Handles Kotlin's synthetic "Kt" class naming convention.
+        Opens the persistent parse cache, which maps a file path to the content
+        hash and metadata of its last parse. Returns None if it cannot be opened.
         """
         try:
-            with open(absolute_disk_path, "rb") as f: # Read as binary for tree-sitter
-                content = f.read()
-
-            tree = _parser.parse(content)
-            root = tree.root_node
-
-            package_name = ""
-            found_types_with_kind = []
-            has_top_level_members = False
-
-            for child in root.children:
-                if child.type == "package_header":
-                    for node in child.children:
-                        if node.type == "qualified_identifier":
-                            package_name = node.text.decode("utf-8")
-                            break
-                elif child.type in ["class_declaration", "object_declaration", "interface_declaration", "annotation_class"]:
-                    name_node = child.child_by_field_name("name")
-                    if name_node:
-                        found_types_with_kind.append((name_node.text.decode("utf-8"), child.type))
-                elif child.type in ["function_declaration", "property_declaration"]:
-                    has_top_level_members = True
-
-            fqns = []
-            prefix = f"{package_name}." if package_name else ""
-
-            for type_name, kind in found_types_with_kind:
-                fqns.append(f"{prefix}{type_name}")
-
-            if has_top_level_members:
-                base_name = os.path.splitext(os.path.basename(absolute_disk_path))[0]
-                virtual_class_simple_name = f"{base_name.capitalize()}Kt"
-                fqns.append(f"{prefix}{virtual_class_simple_name}")
-
-            if package_name and package_name not in fqns:
-                fqns.append(package_name)
-
-            return {
-                "path": absolute_disk_path,
-                "package": package_name,
-                "fqns": fqns
-            }
-        except Exception as e:
-            logger.error(f"Error reading or processing Kotlin file {absolute_disk_path}: {e}")
-            return {
-                "path": absolute_disk_path,
-                "package": "",
-                "fqns": [],
-                "error": str(e)
-            }
-
-    def parse_project(self) -> List[Dict[str, Any]]: # Modified signature and logic
+            os.makedirs(os.path.dirname(_PARSE_CACHE_PATH), exist_ok=True)
+            conn = sqlite3.connect(_PARSE_CACHE_PATH)
+            conn.execute("CREATE TABLE IF NOT EXISTS cache(path TEXT PRIMARY KEY, sha TEXT, meta TEXT)")
+            return conn
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Kotlin parse cache disabled, could not open {_PARSE_CACHE_PATH}: {e}")
+            return None
+
+    def _close_parse_cache(self):
+        """Closes the parse cache connection, if open."""
+        if self._cache_conn is not None:
+            self._cache_conn.close()
+            self._cache_conn = None
+
+    def _load_cached_metadata(self) -> Dict[str, Tuple[str, FileMetadata]]:
+        """Returns {path: (sha, metadata)} for all cached entries."""
+        if self._cache_conn is None:
+            return {}
+        cached = {}
+        for path, sha, meta in self._cache_conn.execute("SELECT path, sha, meta FROM cache"):
+            data = json.loads(meta)
+            cached[path] = (sha, FileMetadata(path=path, package=data["package"], fqns=data["fqns"]))
+        return cached
+
+    def _store_cached_metadata(self, entries: List[Tuple[str, str, FileMetadata]]):
+        """Persists freshly parsed (path, sha, metadata) entries."""
+        if self._cache_conn is None or not entries:
+            return
+        try:
+            with self._cache_conn:
+                self._cache_conn.executemany(
+                    "INSERT OR REPLACE INTO cache(path, sha, meta) VALUES (?, ?, ?)",
+                    [(path, sha, json.dumps({"package": meta.package, "fqns": meta.fqns})) for path, sha, meta in entries],
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not update Kotlin parse cache {_PARSE_CACHE_PATH}: {e}")
+
+    def parse_project(self) -> List[FileMetadata]: # Modified signature and logic
         """
         Queries Neo4j for Kotlin source files, parses them, and returns their metadata.
         """
         query = """
-        MATCH (f:SourceFile)
-        WHERE f.absolute_path ENDS WITH '.kt'
+        MATCH (f:SourceFile {language: 'kotlin'})
         RETURN f.absolute_path AS absolutePath
         """
-        kotlin_files_in_graph = self.neo4j_manager.execute_read_query(query)
+        cached = self._load_cached_metadata()
+        files_to_parse = []
+
+        def stream_paths():
+            # Paths are handed to the pool as the driver fetches them
+            for record in self.neo4j_manager.stream_read_query(query):
+                files_to_parse.append(record["absolutePath"])
+                yield record["absolutePath"]
 
-        files_to_parse = [record["absolutePath"] for record in kotlin_files_in_graph]
+        paths, paths_for_sha = tee(stream_paths())
+        cached_shas = (cached[path][0] if path in cached else None for path in paths_for_sha)
 
         all_kotlin_metadata = []
-        logger.info(f"Parsing {len(files_to_parse)} Kotlin files from graph query.")
-        for path in files_to_parse:
-            metadata = self._get_kotlin_file_metadata(path)
-            if metadata:
+        new_cache_entries = []
+        # Phase 1: parse files in parallel; tree-sitter parsing is CPU-bound.
+        # Spawned, not forked: the pool is created from a thread while other threads
+        # (Java parsing, the logging listener) may hold locks a forked child would inherit.
+        with ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker,
+                                 initargs=(get_log_queue(),)) as executor:
+            results = executor.map(_get_kotlin_file_metadata, paths, cached_shas, chunksize=32)
+            logger.info(f"Submitted {len(files_to_parse)} Kotlin files for parsing "
+                        f"({sum(path in cached for path in files_to_parse)} cached).")
+            # Phase 2: collect results serially in the main process.
+            for path, (sha, metadata) in zip(files_to_parse, results):
+                if metadata is None:
+                    # Content unchanged since the cached parse
+                    metadata = cached[path][1]
+                elif sha and not metadata.error:
+                    new_cache_entries.append((path, sha, metadata))
                 all_kotlin_metadata.append(metadata)
+        self._store_cached_metadata(new_cache_entries)
+        self._close_parse_cache()
         logger.info(f"Finished parsing. Found metadata for {len(all_kotlin_metadata)} Kotlin files.")
         return all_kotlin_metadata
 
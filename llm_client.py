@@ -4,18 +4,54 @@ This module provides a client for interacting with various LLM APIs.
 """
 
 import os
+import json
+import functools
 import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Iterator, Optional
 import requests # NOTE: This script requires the 'requests' library to be installed.
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
 # --- Summarization Clients ---
 
+class RateLimiter:
+    """
+    Thread-safe token bucket that limits the number of requests per minute.
+    """
+    def __init__(self, requests_per_minute: int):
+        self.capacity = max(1, requests_per_minute)
+        self.fill_rate = self.capacity / 60.0
+        self.tokens = float(self.capacity)
+        self.timestamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a request slot is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.timestamp) * self.fill_rate)
+                self.timestamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
 class LlmClient:
     """
     Base class for LLM clients.
     """
     is_local: bool = False
+    # Number of concurrent requests the summarization passes send to the provider
+    batch_max_workers: int = 16
 
     def generate_summary(self, prompt: str) -> str:
         """
@@ -23,6 +59,32 @@ class LlmClient:
         """
         raise NotImplementedError
 
+    @staticmethod
+    def _create_session(api_key: Optional[str] = None) -> requests.Session:
+        """
+        Creates an HTTP session whose pooled connections are kept alive across
+        calls, with automatic retry on rate limiting and transient server errors.
+        """
+        session = requests.Session()
+        if api_key:
+            session.headers.update({"Authorization": f"Bearer {api_key}"})
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 502, 503, 504],
+            allowed_methods=frozenset(["POST"]),
+        )
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        """Releases the pooled HTTP connections, if any."""
+        session = getattr(self, "session", None)
+        if session is not None:
+            session.close()
+
 class OpenAiClient(LlmClient):
     """
     Client for OpenAI's API.
@@ -33,15 +95,17 @@ class OpenAiClient(LlmClient):
             raise ValueError("OPENAI_API_KEY environment variable not set.")
         self.api_url = "https://api.openai.com/v1/chat/completions"
         self.model = os.environ.get("OPENAI_MODEL", "gpt-3.5-turbo")
+        self.session = self._create_session(self.api_key)
+        self.rate_limiter = RateLimiter(int(os.environ.get("OPENAI_RPM", "500")))
 
     def generate_summary(self, prompt: str) -> str:
-        headers = {"Authorization": f"Bearer {self.api_key}"}
         payload = {
             "model": self.model,
             "messages": [{"role": "user", "content": prompt}]
         }
+        self.rate_limiter.acquire()
         try:
-            response = requests.post(self.api_url, headers=headers, json=payload, timeout=120)
+            response = self.session.post(self.api_url, json=payload, timeout=120)
             response.raise_for_status()
             return response.json()['choices'][0]['message']['content']
         except requests.RequestException as e:
@@ -58,15 +122,15 @@ class DeepSeekClient(LlmClient):
             raise ValueError("DEEPSEEK_API_KEY environment variable not set.")
         self.api_url = "https://api.deepseek.com/chat/completions"
         self.model = os.environ.get("DEEPSEEK_MODEL", "deepseek-coder")
+        self.session = self._create_session(self.api_key)
 
     def generate_summary(self, prompt: str) -> str:
-        headers = {"Authorization": f"Bearer {self.api_key}"}
         payload = {
             "model": self.model,
             "messages": [{"role": "user", "content": prompt}]
         }
         try:
-            response = requests.post(self.api_url, headers=headers, json=payload, timeout=120)
+            response = self.session.post(self.api_url, json=payload, timeout=120)
             response.raise_for_status()
             return response.json()['choices'][0]['message']['content']
         except requests.RequestException as e:
@@ -78,6 +142,8 @@ class OllamaClient(LlmClient):
     Client for a local Ollama instance.
     """
     is_local: bool = True
+    # The local GPU serializes generation, so only a few requests are kept in flight
+    batch_max_workers: int = 2
 
     def __init__(self):
         #self.base_url = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
@@ -88,26 +154,42 @@ class OllamaClient(LlmClient):
         # TODO: the deepseek-r1:8b model generates response with tags like <think>...</think> that should be removed
         #self.model = os.environ.get("OLLAMA_MODEL", "deepseek-r1:8b")
         self.model = os.environ.get("OLLAMA_MODEL", "deepseek-llm:7b")
+        self.session = self._create_session()
 
     def generate_summary(self, prompt: str) -> str:
         return self.generate_summary_chat(prompt)
 
     def generate_summary_chat(self, prompt: str) -> str:
+        return "".join(self.stream_summary_chat(prompt))
+
+    def stream_summary_chat(self, prompt: str) -> Iterator[str]:
+        """
+        Yields the response content chunk by chunk as Ollama generates it,
+        instead of waiting for the server to buffer the whole answer.
+        """
         payload = {
             "model": self.model,
             "messages": [
                 {"role": "user", "content": prompt}
             ],
-            "stream": False
+            "stream": True
         }
 
-        response = requests.post(
+        with self.session.post(
             f"{self.base_url}/api/chat",
             json=payload,
-            timeout=300
-        )
-        response.raise_for_status()
-        return response.json()["message"]["content"]
+            timeout=300,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            # The body is newline-delimited JSON, one object per generated chunk
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                yield chunk.get("message", {}).get("content", "")
+                if chunk.get("done"):
+                    break
 
     def generate_summary_reasoning(self, prompt: str) -> str:
         payload = {
@@ -116,7 +198,7 @@ class OllamaClient(LlmClient):
             "stream": False
         }
         try:
-            response = requests.post(self.api_url, json=payload, timeout=300)
+            response = self.session.post(self.api_url, json=payload, timeout=300)
             response.raise_for_status()
             return response.json()['response']
         except requests.RequestException as e:
@@ -136,21 +218,36 @@ class FakeLlmClient(LlmClient):
         return "This part implements important functionalities."
 
 
+_LLM_CLIENT_REGISTRY = {
+    'openai': OpenAiClient,
+    'deepseek': DeepSeekClient,
+    'ollama': OllamaClient,
+    'fake': FakeLlmClient,
+}
+
 def get_llm_client(api_name: str) -> LlmClient:
     """
     Factory function to get an LLM client.
+    Clients are cached per api_name (case-insensitive), so repeated calls share one instance and its HTTP session.
+    """
+    return _get_cached_llm_client(api_name.lower())
+
+def close_llm_client(client: LlmClient):
+    """
+    Closes a client obtained from get_llm_client and drops the cached clients,
+    so later get_llm_client calls build a fresh one instead of returning a closed session.
     """
-    api_name = api_name.lower()
-    if api_name == 'openai':
-        return OpenAiClient()
-    elif api_name == 'deepseek':
-        return DeepSeekClient()
-    elif api_name == 'ollama':
-        return OllamaClient()
-    elif api_name == 'fake':
-        return FakeLlmClient()
-    else:
-        raise ValueError(f"Unknown API: {api_name}. Supported APIs are: openai, deepseek, ollama, fake.")
+    client.close()
+    _get_cached_llm_client.cache_clear()
+
+@functools.lru_cache(maxsize=8)
+def _get_cached_llm_client(api_name: str) -> LlmClient:
+    """Creates the client for a normalized api_name; cached by get_llm_client."""
+    try:
+        client_class = _LLM_CLIENT_REGISTRY[api_name]
+    except KeyError:
+        raise ValueError(f"Unknown API: {api_name}. Supported APIs are: {', '.join(_LLM_CLIENT_REGISTRY)}.") from None
+    return client_class()
 
 # --- Embedding Clients ---
 # NOTE: The SentenceTransformerClient requires 'sentence-transformers' and 'torch'
@@ -162,12 +259,16 @@ class EmbeddingClient:
     """
     is_local: bool = False
 
-    def generate_embeddings(self, texts: list[str], show_progress_bar: bool = True) -> list[list[float]]:
+    def generate_embeddings(self, texts: list[str], show_progress_bar: bool = True) -> "np.ndarray":
         """
-        Generates embedding vectors for a given list of texts.
+        Generates embedding vectors for a given list of texts as a float32 array
+        of shape (len(texts), dimensions).
         """
         raise NotImplementedError
 
+# Loaded SentenceTransformer models, keyed by model name, shared by all clients in the process
+_MODEL_CACHE: dict = {}
+
 class SentenceTransformerClient(EmbeddingClient):
     """
     Client that uses a local SentenceTransformer model.
@@ -176,17 +277,26 @@ class SentenceTransformerClient(EmbeddingClient):
 
     def __init__(self):
         try:
+            import torch
             from sentence_transformers import SentenceTransformer
         except ImportError:
             raise ImportError("The 'sentence-transformers' package is required for local embeddings. Please run 'pip install sentence-transformers' to install it.")
         
         model_name = os.environ.get("SENTENCE_TRANSFORMER_MODEL", "all-MiniLM-L6-v2")
-        logger.info(f"Loading local SentenceTransformer model: {model_name}")
-        # The model will be downloaded on first use and cached by the library.
-        self.model = SentenceTransformer(model_name)
-        logger.info("SentenceTransformer model loaded successfully.")
+        if model_name not in _MODEL_CACHE:
+            logger.info(f"Loading local SentenceTransformer model: {model_name}")
+            # The model will be downloaded on first use and cached by the library.
+            if torch.cuda.is_available():
+                # Half precision halves memory traffic on GPU; CPU inference stays in fp32
+                _MODEL_CACHE[model_name] = SentenceTransformer(
+                    model_name, device="cuda", model_kwargs={"torch_dtype": torch.float16}
+                )
+            else:
+                _MODEL_CACHE[model_name] = SentenceTransformer(model_name, device="cpu")
+            logger.info("SentenceTransformer model loaded successfully.")
+        self.model = _MODEL_CACHE[model_name]
 
-    def generate_embeddings(self, texts: list[str], show_progress_bar: bool = True) -> list[list[float]]:
+    def generate_embeddings(self, texts: list[str], show_progress_bar: bool = True) -> "np.ndarray":
         """
         Generates embedding vectors for a given list of texts.
         
@@ -195,17 +305,26 @@ class SentenceTransformerClient(EmbeddingClient):
             show_progress_bar: Whether to show a progress bar during encoding
             
         Returns:
-            List of embedding vectors as lists of floats
+            float32 array of shape (len(texts), dimensions). Callers convert to
+            lists only when binding query parameters.
         """
         # The encode method can show its own progress bar, which is useful for large batches.
-        embeddings = self.model.encode(texts, show_progress_bar=show_progress_bar)
-        # Convert numpy arrays to standard lists for JSON/Neo4j compatibility
-        return [emb.tolist() for emb in embeddings]
+        embeddings = self.model.encode(
+            texts,
+            batch_size=64,
+            show_progress_bar=show_progress_bar,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        # fp16 models on GPU return float16 rows
+        return embeddings.astype("float32", copy=False)
 
 
+@functools.lru_cache(maxsize=8)
 def get_embedding_client(api_name: str) -> EmbeddingClient:
     """
     Factory function to get an embedding client.
+    Clients are cached per api_name, so repeated calls share one instance.
     """
     # The api_name can be used in the future to select different embedding models/APIs
     # For now, we default to the local sentence-transformer for all cases.
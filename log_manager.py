@@ -1,33 +1,28 @@
+import atexit
 import logging
+import logging.handlers
 import sys
 import multiprocessing as mp
 
 def is_main_process():
     return mp.current_process().name == "MainProcess"
 
-# --- 1. Custom Filter Classes ---
-
-class DebugOnlyFilter(logging.Filter):
-    """Passes ONLY messages with an exact level of DEBUG."""
-    def filter(self, record):
-        return record.levelno == logging.DEBUG
-
-
-class InfoAndUpFilter(logging.Filter):
-    """Passes ONLY messages with INFO and higher."""
-    def filter(self, record):
-        return record.levelno >= logging.INFO
-
-
-# --- 2. Public initialization function ---
+# --- Public initialization function ---
 
 _initialized = False  # Prevent re-initializing when multiple modules import
+_log_queue = None  # Worker processes send their records here
+_listener = None  # Drains _log_queue into the main process handlers
 
 
 def init_logging(log_file: str = "debug.log", console_level: str = "INFO"):
     """
     Initializes the logging configuration for the application.
+    Subsequent calls are no-ops, so each record is formatted and written once.
     """
+    global _initialized
+    if _initialized:
+        return  # Avoid double handlers and duplicated output
+
     # Root logger setup
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)  # Capture all messages
@@ -43,50 +38,54 @@ def init_logging(log_file: str = "debug.log", console_level: str = "INFO"):
     console_handler.setFormatter(console_formatter)
     root_logger.addHandler(console_handler)
 
-    # File Handler (prints DEBUG and above to a file)
-    try:
-        file_handler = logging.FileHandler(log_file, mode='w')
-        file_handler.setLevel(logging.DEBUG)
-        file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(file_formatter)
-        root_logger.addHandler(file_handler)
-    except Exception as e:
-        logging.error(f"Failed to initialize file logger at {log_file}: {e}")
-
-    global _initialized
-    if _initialized:
-        return  # Avoid double handlers and duplicated output
+    # File Handler (prints DEBUG and above to a file); only the main process owns the file
+    if is_main_process():
+        try:
+            file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
+            file_handler.setLevel(logging.DEBUG)
+            file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            file_handler.setFormatter(file_formatter)
+            root_logger.addHandler(file_handler)
+        except Exception as e:
+            logging.error(f"Failed to initialize file logger at {log_file}: {e}")
+
+    # Records from worker processes are written by the main process handlers
+    global _log_queue, _listener
+    if is_main_process():
+        # Created in the spawn context so it can be handed to spawned worker pools
+        _log_queue = mp.get_context("spawn").Queue()
+        _listener = logging.handlers.QueueListener(
+            _log_queue, *root_logger.handlers, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(shutdown_logging)
 
-    # Root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
+    _initialized = True
 
-    # Application logger (__main__ OR callers)
-    app_logger = logging.getLogger(__name__)
-    app_logger.setLevel(logging.DEBUG)
 
-    # --- Handlers ---
+def get_log_queue():
+    """Returns the queue worker processes should log to, or None if logging is not initialized."""
+    return _log_queue
 
-    # Console handler: INFO and above
-    stdout_handler = logging.StreamHandler(sys.stdout)
-    stdout_handler.setLevel(logging.DEBUG)
-    stdout_handler.addFilter(InfoAndUpFilter())
-    stdout_handler.setFormatter(
-        logging.Formatter('%(asctime)s - [%(levelname)s] %(message)s')
-    )
-    # Attach handlers
-    root_logger.addHandler(stdout_handler)
 
-    # File handler: DEBUG only
-    if is_main_process():
-        file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.addFilter(DebugOnlyFilter())
-        file_handler.setFormatter(
-            logging.Formatter('%(asctime)s - %(name)s - [%(levelname)s] %(message)s')
-        )
+def init_worker_logging(log_queue):
+    """
+    Process pool initializer: routes all records of a worker process through
+    log_queue instead of handlers inherited from the parent, so only the main
+    process touches the console and the log file.
+    """
+    if log_queue is None:
+        return
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(logging.DEBUG)
 
-        # Attach handlers
-        root_logger.addHandler(file_handler)
 
-    _initialized = True
\ No newline at end of file
+def shutdown_logging():
+    """Flushes pending worker records and stops the queue listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
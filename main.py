@@ -1,7 +1,6 @@
 import argparse
 import logging
 import sys
-from pathlib import Path
 
 # Import modules from the same directory
 from input_params import add_neo4j_args, add_logging_args, add_rag_args
@@ -30,7 +29,9 @@ def main():
     uri, user, password = args.uri, args.user, args.password
 
     try:
-        with Neo4jManager(uri=uri, user=user, password=password) as neo4j_mgr:
+        with Neo4jManager(uri=uri, user=user, password=password, database=args.database,
+                          pool_size=args.pool_size, acq_timeout=args.acquisition_timeout,
+                          max_lifetime=args.max_lifetime) as neo4j_mgr:
             if not neo4j_mgr.check_connection():
                 logger.critical("Failed to connect to Neo4j. Exiting.")
                 sys.exit(1)
@@ -1,8 +1,9 @@
-import os, argparse, logging, re
-from typing import Optional, Dict, Any
+import os, argparse, asyncio, functools, logging, time, weakref
+from typing import Optional, Dict, Any, List, Set, Tuple
 
 from fastmcp import FastMCP
-from neo4j_manager import Neo4jManager
+from neo4j_manager import Neo4jManager, AsyncNeo4jManager
+from cypher_guard import check_read_only_cypher
 from llm_client import get_embedding_client
 
 # --- Configuration and Initialization ---
@@ -12,55 +13,140 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 mcp = FastMCP()
 
 # Globals to be initialized on startup
-neo4j_mgr: Optional[Neo4jManager] = None
+neo4j_mgr: Optional[AsyncNeo4jManager] = None
 project_root_path: Optional[str] = None
 embedding_client = get_embedding_client("sentence-transformer")
 
+# The :Project node does not change while the server runs, so its info is cached
+_PROJECT_INFO_TTL = 300.0
+_project_info_cache: Optional[Dict[str, str]] = None
+_project_info_ts: float = 0.0
+
+
+class _EmbeddingBatcher:
+    """
+    Coalesces concurrent embedding requests into one encode call. A request waits
+    at most max_wait seconds for others to join, or until max_batch are pending.
+    """
+    def __init__(self, client, max_batch: int = 32, max_wait: float = 0.01):
+        self.client = client
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # The loop only holds weak references to tasks; in-flight encodes are kept alive here
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def embed(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._encode(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _encode(self, batch: List[Tuple[str, asyncio.Future]]):
+        texts = [text for text, _ in batch]
+        try:
+            # Encoding is CPU-bound; keep it off the event loop
+            embeddings = await asyncio.to_thread(self.client.generate_embeddings, texts, False)
+            rows = embeddings.tolist()
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), row in zip(batch, rows):
+            if not future.done():
+                future.set_result(row)
+
+
+_embedding_batcher = _EmbeddingBatcher(embedding_client)
+
 # --- Helper Functions ---
-def _initialize_managers(uri, user, password):
+def _initialize_managers(uri, user, password, database=None, pool_size=50, acq_timeout=30.0, max_lifetime=3600.0):
     """Initializes Neo4j connection and discovers project root path."""
     global neo4j_mgr, project_root_path
     if neo4j_mgr is None:
-        neo4j_mgr = Neo4jManager(uri, user, password)
-        if not neo4j_mgr.check_connection():
-            logger.critical("Failed to connect to Neo4j. Exiting.")
-            raise ConnectionError("Failed to connect to Neo4j.")
-        
-        query = "MATCH (p:Project) RETURN p.absolute_path AS path"
-        result = neo4j_mgr.execute_read_query(query)
-        if result and result[0] and result[0].get('path'):
-            project_root_path = result[0]['path']
+        # Startup checks use a short-lived sync connection; the tools share one async driver
+        with Neo4jManager(uri, user, password, database=database) as startup_mgr:
+            if not startup_mgr.check_connection():
+                logger.critical("Failed to connect to Neo4j. Exiting.")
+                raise ConnectionError("Failed to connect to Neo4j.")
+            result = startup_mgr.execute_read_query_single(_PROJECT_INFO_QUERY)
+        if result and result.get('path'):
+            project_root_path = result['path']
             logger.info(f"Discovered project root: {project_root_path}")
+            # Seed the cache so the first get_project_info call needs no round trip
+            _cache_project_info(result)
         else:
             logger.critical("Could not determine project root path from Neo4j.")
             raise ValueError("Project root path not found in Neo4j.")
         
+        neo4j_mgr = AsyncNeo4jManager(uri, user, password, database=database, pool_size=pool_size,
+                                      acq_timeout=acq_timeout, max_lifetime=max_lifetime)
+        # Warm up the embedding model so tokenizer/device initialization is not paid by the first search
+        embedding_client.generate_embeddings([" "], show_progress_bar=False)
         logger.info("Graph is assumed to contain embeddings. Semantic search is enabled.")
 
-def _read_file_slice(file_path: str, start_line: int, end_line: int) -> str:
-    """Reads a specific 1-based line range from a file."""
-    try:
-        with open(file_path, 'r', errors='ignore') as f:
-            lines = f.readlines()
-        # Adjust for 0-based indexing of list slicing
-        code_lines = lines[start_line - 1 : end_line]
-        return "".join(code_lines)
-    except Exception as e:
-        logger.error(f"Error reading file slice {file_path} lines {start_line}-{end_line}: {e}")
-        return f"Error reading file: {e}"
+_PROJECT_INFO_QUERY = "MATCH (p:Project) RETURN p.name AS name, p.absolute_path AS path, p.summary AS summary"
+
+def _cache_project_info(result: Dict[str, Any]) -> Dict[str, str]:
+    """Builds the get_project_info response from a :Project record and caches it."""
+    global _project_info_cache, _project_info_ts
+    _project_info_cache = {
+        "name": result.get('name') or 'N/A',
+        "path": result.get('path') or 'N/A',
+        "summary": result.get("summary") or "No project summary available."
+    }
+    _project_info_ts = time.monotonic()
+    return _project_info_cache
+
+@functools.lru_cache(maxsize=256)
+def _read_file_lines(file_path: str, mtime: float) -> Tuple[str, ...]:
+    """
+    Reads all lines of a file. Cached per (path, mtime), so successive requests for
+    the same file skip the disk until it is modified.
+    """
+    with open(file_path, 'r', errors='ignore') as f:
+        return tuple(f.readlines())
+
+# One lock per path, so concurrent requests for the same file share a single read.
+# Weakly held: a path's lock is dropped once no request is waiting on it.
+_file_read_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+async def _read_file_lines_async(file_path: str) -> Tuple[str, ...]:
+    """Reads a file's lines in a worker thread so the event loop is not blocked on disk I/O."""
+    lock = _file_read_locks.get(file_path)
+    if lock is None:
+        lock = _file_read_locks[file_path] = asyncio.Lock()
+    async with lock:
+        mtime = await asyncio.to_thread(os.path.getmtime, file_path)
+        return await asyncio.to_thread(_read_file_lines, file_path, mtime)
 
 # --- FastMCP Tools ---
 
 @mcp.tool(name="get_graph_schema", description="Retrieves the curated graph schema to understand node properties and relationships.")
-def get_graph_schema() -> str:
+async def get_graph_schema() -> str:
     """
     Retrieves the content of the mcp_visible_neo4j_schema.txt file.
     """
     schema_file_path = os.path.join(os.path.dirname(__file__), "mcp_visible_neo4j_schema.txt")
     if os.path.isfile(schema_file_path):
         try:
-            with open(schema_file_path, 'r') as f:
-                return f.read()
+            return "".join(await _read_file_lines_async(schema_file_path))
         except Exception as e:
             logger.error(f"Error reading graph schema file: {e}")
             return f"Error: Could not read graph schema file: {e}"
@@ -68,125 +154,155 @@ def get_graph_schema() -> str:
         return "Error: The curated schema file 'mcp_visible_neo4j_schema.txt' was not found."
 
 @mcp.tool(name="get_project_info", description="Retrieves the project's name, root path, and high-level summary.")
-def get_project_info() -> Dict[str, str]:
-    """Queries the Neo4j database for the project's name, root path, and summary."""
+async def get_project_info() -> Dict[str, str]:
+    """
+    Returns the project's name, root path, and summary. They are queried from
+    Neo4j at most once every _PROJECT_INFO_TTL seconds.
+    """
+    if _project_info_cache is not None and time.monotonic() - _project_info_ts < _PROJECT_INFO_TTL:
+        return dict(_project_info_cache)
     try:
-        query = "MATCH (p:Project) RETURN p.name AS name, p.absolute_path AS path, p.summary AS summary"
-        result = neo4j_mgr.execute_read_query(query)
-        if result and result[0]:
-            return {
-                "name": result[0].get('name', 'N/A'), 
-                "path": result[0].get('path', 'N/A'), 
-                "summary": result[0].get("summary") or "No project summary available."
-            }
+        result = await neo4j_mgr.execute_read_query_single(_PROJECT_INFO_QUERY)
+        if result:
+            return dict(_cache_project_info(result))
         return {"error": "No :Project node found in the graph."}
     except Exception as e:
         return {"error": f"Could not retrieve project info: {e}"}
 
 @mcp.tool(name="get_source_code_by_id", description="Retrieves source code for a node (Method, Class, SourceFile, etc.) by its unique entity_id.")
-def get_source_code_by_id(entity_id: str) -> Dict[str, str]:
+async def get_source_code_by_id(entity_id: str) -> Dict[str, str]:
     """
     Retrieves source code for a given entity_id. For Methods, it returns the specific
     body. For other types, it returns the entire source file content.
     """
     try:
         query = """
-        MATCH (n) WHERE n.entity_id = $entity_id
-        OPTIONAL MATCH (n)-[:WITH_SOURCE]->(sf:SourceFile)
+        MATCH (n:Entity {entity_id: $entity_id})
+        CALL {
+            // If the node is a SourceFile itself, its path is the source path
+            WITH n
+            WITH n WHERE 'SourceFile' IN labels(n)
+            RETURN n.absolute_path AS file_path
+            UNION
+            WITH n
+            WITH n WHERE NOT 'SourceFile' IN labels(n)
+            OPTIONAL MATCH (n)-[:WITH_SOURCE]->(sf:SourceFile)
+            RETURN sf.absolute_path AS file_path
+        }
         RETURN
             labels(n) AS labels,
             n.firstLineNumber AS start_line,
             n.lastLineNumber AS end_line,
-            // If the node is a SourceFile itself, its path is the source path
-            CASE WHEN 'SourceFile' IN labels(n) THEN n.absolute_path ELSE sf.absolute_path END AS file_path
+            file_path
         """
-        result = neo4j_mgr.execute_read_query(query, {"entity_id": entity_id})
+        # The entity_id lookup is served by the :Entity(entity_id) uniqueness constraint
+        node_info = await neo4j_mgr.execute_read_query_single(query, {"entity_id": entity_id})
 
-        if not result or not result[0]:
+        if not node_info:
             return {"id": entity_id, "source_code": "Error: Node not found."}
 
-        node_info = result[0]
         labels = node_info.get('labels', [])
         file_path = node_info.get('file_path')
 
         if not file_path:
             return {"id": entity_id, "source_code": "Error: Node has no associated source file."}
         
-        if not os.path.exists(file_path):
-            return {"id": entity_id, "source_code": f"Error: File not found on disk: {file_path}"}
-
         start_line = node_info.get('start_line')
         end_line = node_info.get('end_line')
 
+        # The mtime lookup in _read_file_lines_async doubles as the existence check
+        try:
+            lines = await _read_file_lines_async(file_path)
+        except FileNotFoundError:
+            return {"id": entity_id, "source_code": f"Error: File not found on disk: {file_path}"}
+
         if 'Method' in labels and start_line and end_line:
-            source_code = _read_file_slice(file_path, start_line, end_line)
+            source_code = "".join(lines[start_line - 1 : end_line])
         else:
-            with open(file_path, 'r', errors='ignore') as f:
-                source_code = f.read()
+            source_code = "".join(lines)
         
         return {"id": entity_id, "source_code": source_code}
     except Exception as e:
         return {"id": entity_id, "source_code": f"Error: Could not retrieve source code: {e}"}
 
-@mcp.tool(name="execute_cypher_query", description="Executes a read-only Cypher query against the graph.")
-def execute_cypher_query(query: str) -> Dict[str, Any]:
-    """Executes a read-only Cypher query and returns the results as a list of dictionaries."""
-    read_only_keywords = ['MATCH', 'OPTIONAL MATCH', 'WHERE', 'RETURN', 'UNWIND', 'CALL', 'WITH']
-    if not any(re.search(r'\b' + keyword + r'\b', query, re.IGNORECASE) for keyword in read_only_keywords):
-        return {"error": "Query must contain a read-only keyword."}
-
-    write_keywords = ['CREATE', 'SET', 'DELETE', 'MERGE', 'REMOVE', 'DETACH']
-    if any(re.search(r'\b' + keyword + r'\b', query, re.IGNORECASE) for keyword in write_keywords):
-        return {"error": "Write operations are not allowed."}
+@mcp.tool(name="execute_cypher_query", description="Executes a read-only Cypher query against the graph. Returns column names and rows of values in column order.")
+async def execute_cypher_query(query: str, max_rows: int = 1000) -> Dict[str, Any]:
+    """
+    Executes a read-only Cypher query. The result is returned as "columns", the
+    column names, and "rows", a list of value lists in column order, so names
+    are not repeated per row. At most max_rows rows are returned; "truncated"
+    is set when the result had more.
+    """
+    error = check_read_only_cypher(query)
+    if error:
+        return {"error": error}
 
     try:
-        results = neo4j_mgr.execute_read_query(query)
-        return {"results": [dict(record) for record in results]}
+        columns, rows, truncated = await neo4j_mgr.execute_read_query_limited(query, max_rows)
+        return {"columns": columns, "rows": rows, "truncated": truncated}
     except Exception as e:
         return {"error": f"Could not execute query: {e}"}
 
 @mcp.tool(name="generate_embeddings", description="Generates vector embeddings for a query string.")
-def generate_embeddings(query: str) -> list[float]:
+async def generate_embeddings(query: str) -> list[float]:
     """Generates vector embeddings for a query string for semantic search."""
-    embeddings = embedding_client.generate_embeddings([query], show_progress_bar=False)
-    return embeddings[0] if embeddings else []
+    return await _embedding_batcher.embed(query)
 
 @mcp.tool(name="search_nodes_for_semantic_similarity", description="Performs a semantic similarity search across nodes in the graph.")
-def search_nodes_for_semantic_similarity(query: str, num_results: int = 5) -> Dict[str, Any]:
-    """Performs a vector similarity search on node summaries."""
+async def search_nodes_for_semantic_similarity(query: str, num_results: int = 5, min_score: float = 0.5) -> Dict[str, Any]:
+    """
+    Performs a vector similarity search on node summaries. Matches scoring below
+    min_score are dropped, and summaries are truncated to a 512-character preview.
+    """
     try:
-        embedding = generate_embeddings(query)
+        # The embedding is computed while the connection pool is opened, if it is still cold
+        embedding, _ = await asyncio.gather(_embedding_batcher.embed(query), neo4j_mgr.warm_up())
         if not embedding:
             return {"error": "Failed to generate embedding for the query."}
 
         cypher_query = """
             CALL db.index.vector.queryNodes('summaryEmbeddings', $num_results, $embedding)
             YIELD node, score
+            WHERE score >= $min_score
             RETURN 
                 node.entity_id AS id, 
                 coalesce(node.fqn, node.name, node.absolute_path) AS name, 
                 labels(node) AS labels, 
-                node.summary AS summary, 
+                substring(node.summary, 0, 512) AS summary, 
                 score
             ORDER BY score DESC
         """
-        params = {"num_results": num_results, "embedding": embedding}
-        results = neo4j_mgr.execute_read_query(cypher_query, params)
+        params = {"num_results": num_results, "embedding": embedding, "min_score": min_score}
+        results = await neo4j_mgr.execute_read_query(cypher_query, params)
         return {"results": results}
     except Exception as e:
         return {"error": f"An error occurred during semantic search: {e}"}
 
 # --- FastMCP Application ---
+async def _serve(host: str, port: int):
+    """
+    Serves the MCP tools until shutdown, then closes the async Neo4j driver on the
+    same event loop that used it.
+    """
+    try:
+        await mcp.run_async(transport="streamable-http", host=host, port=port)
+    finally:
+        if neo4j_mgr is not None:
+            await neo4j_mgr.close()
+
 if __name__ == "__main__":
     import uvicorn
     parser = argparse.ArgumentParser(description="Start the FastMCP server for jqassistant-graph-rag.")
     parser.add_argument("--uri", default="bolt://localhost:7688", help="Neo4j Bolt URI")
     parser.add_argument("--user", default="neo4j", help="Neo4j username")
     parser.add_argument("--password", default="neo4j", help="Neo4j password")
+    parser.add_argument("--database", default=None, help="Neo4j database (defaults to the server's default database)")
+    parser.add_argument("--pool-size", type=int, default=50, help="Maximum number of pooled Neo4j connections")
+    parser.add_argument("--acquisition-timeout", type=float, default=30.0, help="Seconds to wait for a pooled Neo4j connection")
+    parser.add_argument("--max-lifetime", type=float, default=3600.0, help="Seconds after which a pooled Neo4j connection is replaced")
     args = parser.parse_args()
 
     logger.info("Starting FastMCP server for jqassistant-graph-rag...")
-    _initialize_managers(args.uri, args.user, args.password)
-    mcp.run(transport="streamable-http", host="0.0.0.0", port=8800)
-    if neo4j_mgr:
-        neo4j_mgr.close()
+    _initialize_managers(args.uri, args.user, args.password, args.database,
+                         args.pool_size, args.acquisition_timeout, args.max_lifetime)
+    asyncio.run(_serve(host="0.0.0.0", port=8800))
@@ -1,6 +1,9 @@
 import logging
 import os
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby, islice
+from operator import itemgetter
+from typing import Optional, Dict, Any, List
 from base_summarizer import BaseSummarizer
 from node_summary_processor import NodeSummaryProcessor
 from neo4j_manager import Neo4jManager
@@ -16,17 +19,22 @@ class MethodAnalyzer(BaseSummarizer):
 
     def run(self) -> int:
         logger.info(f"--- Starting Pass: {self.__class__.__name__} ---")
-        items_to_process = self.neo4j_manager.execute_read_query(self._get_items_query())
+        rows = self.neo4j_manager.execute_read_query_tuples(self._get_items_query())
         
-        if not items_to_process:
+        if not rows:
             logger.warning(f"No items found for {self.__class__.__name__}. Skipping pass.")
             return 0
             
+        items_to_process = self._build_items(rows)
+        # Longest methods first: they take the longest to analyze (and may be chunked),
+        # so starting them early keeps them from straggling after the pool drains
+        items_to_process.sort(key=lambda item: len(item['source_code'] or ''), reverse=True)
         updated_count = self.process_batch(items_to_process)
         logger.info(f"--- Pass {self.__class__.__name__} complete. Updated {updated_count} properties. ---")
         return updated_count
 
     def _get_items_query(self) -> str:
+        # Column order matters: rows are unpacked positionally in _build_items
         return """
         MATCH (m:Method)-[:WITH_SOURCE]->(sf:SourceFile)
         WHERE m.firstLineNumber IS NOT NULL AND m.lastLineNumber IS NOT NULL
@@ -42,45 +50,83 @@ class MethodAnalyzer(BaseSummarizer):
     def _get_update_query(self) -> str:
         return """
         UNWIND $updates AS item
-        MATCH (m:Method {entity_id: item.id})
+        MATCH (m:Entity:Method {entity_id: item.id})
         SET m.code_analysis = item.code_analysis, m.code_hash = item.code_hash
         """
 
-    def _prepare_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Hook to extract the method's source code before processing.
-        """
-        item['source_code'] = self._extract_method_code_snippet(
-            item['sourceFilePath'], item['signature'], item['firstLine'], item['lastLine']
-        )
-        return item
-
     def _get_processor_result(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Calls the appropriate method on the NodeSummaryProcessor.
         """
         return self.node_summary_processor.get_method_code_analysis(item)
 
-    def _extract_method_code_snippet(self, file_path: str, signature: str, first_line: int, last_line: int) -> Optional[str]:
+    def _build_items(self, rows: List[tuple]) -> List[Dict[str, Any]]:
         """
-        Reads a source file and extracts the code snippet for a method.
+        Builds the items to process, including their 'source_code', from the rows of
+        _get_items_query. Rows are grouped by source file so each file is read once
+        and all of its methods are sliced in memory.
         """
-        try:
-            if not os.path.isabs(file_path) or not os.path.exists(file_path):
-                logger.error(f"Source file not found or path is not absolute: {file_path}")
-                return None
+        rows.sort(key=itemgetter(1))
+        groups = [(file_path, list(group)) for file_path, group in groupby(rows, key=itemgetter(1))]
+        items = []
+        # File reads are I/O-bound, so several files are read concurrently
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+            all_lines = executor.map(
+                self._read_source_lines,
+                [file_path for file_path, _ in groups],
+                # Only the lines up to the group's last method are needed
+                [max(row[4] for row in group) for _, group in groups],
+            )
+            for (file_path, group), lines in zip(groups, all_lines):
+                for node_id, _, signature, first_line, last_line, db_analysis, db_hash in group:
+                    items.append({
+                        'id': node_id,
+                        'sourceFilePath': file_path,
+                        'signature': signature,
+                        'firstLine': first_line,
+                        'lastLine': last_line,
+                        'db_analysis': db_analysis,
+                        'db_hash': db_hash,
+                        'source_code': None if lines is None else self._extract_method_code_snippet(
+                            lines, file_path, signature, first_line, last_line
+                        ),
+                    })
+        return items
 
+    def _read_source_lines(self, file_path: str, max_line: Optional[int] = None) -> Optional[List[str]]:
+        """
+        Reads the first max_line lines of a source file (all lines if max_line is
+        None), or returns None if it cannot be read. The rest of the file is never
+        loaded into memory.
+        """
+        if not os.path.isabs(file_path):
+            logger.error(f"Source file path is not absolute: {file_path}")
+            return None
+        # open() is the only filesystem call; a missing file surfaces as FileNotFoundError
+        try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            start_index = first_line - 1
-            end_index = last_line
-
-            if not (0 <= start_index < end_index <= len(lines)):
-                logger.warning(f"Invalid line numbers for method {signature} in {file_path}: {first_line}-{last_line}. File has {len(lines)} lines.")
-                return "".join(lines)
-            
-            return "".join(lines[start_index:end_index])
+                return list(islice(f, max_line))
+        except FileNotFoundError:
+            logger.error(f"Source file not found: {file_path}")
+            return None
         except Exception as e:
-            logger.error(f"Error extracting code snippet for method {signature} from {file_path}: {e}")
+            logger.error(f"Error reading source file {file_path}: {e}")
             return None
+
+    def _extract_method_code_snippet(self, lines: List[str], file_path: str, signature: str, first_line: int, last_line: int) -> Optional[str]:
+        """
+        Extracts the code snippet for a method from the (possibly truncated) lines
+        of its source file. On invalid line numbers the whole file is used instead.
+        """
+        start_index = first_line - 1
+        end_index = last_line
+
+        if not (0 <= start_index < end_index <= len(lines)):
+            # lines stops at the group's last needed line, so re-read the whole file
+            all_lines = self._read_source_lines(file_path)
+            if all_lines is None:
+                return None
+            logger.warning(f"Invalid line numbers for method {signature} in {file_path}: {first_line}-{last_line}. File has {len(all_lines)} lines.")
+            return "".join(all_lines)
+
+        return "".join(lines[start_index:end_index])
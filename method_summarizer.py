@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from base_summarizer import BaseSummarizer
 from node_summary_processor import NodeSummaryProcessor
 from neo4j_manager import Neo4jManager
@@ -29,22 +29,35 @@ class MethodSummarizer(BaseSummarizer):
         return """
         MATCH (m:Method)
         WHERE m.code_analysis IS NOT NULL
-        OPTIONAL MATCH (caller:Method)-[:INVOKES]->(m)
-        OPTIONAL MATCH (m)-[:INVOKES]->(callee:Method)
+        // Callers and callees are collected in separate subqueries so their rows are never cross-multiplied
+        CALL {
+            WITH m
+            OPTIONAL MATCH (caller:Method)-[:INVOKES]->(m)
+            RETURN collect(DISTINCT caller.name) AS callers
+        }
+        CALL {
+            WITH m
+            OPTIONAL MATCH (m)-[:INVOKES]->(callee:Method)
+            RETURN collect(DISTINCT callee.name) AS callees
+        }
         RETURN m.entity_id AS id,
                m.name AS name,
                m.summary AS db_summary,
-               collect(DISTINCT caller.name) AS callers,
-               collect(DISTINCT callee.name) AS callees
+               callers,
+               callees
         """
 
     def _get_update_query(self) -> str:
         return """
         UNWIND $updates AS item
-        MATCH (m:Method {entity_id: item.id})
+        MATCH (m:Entity:Method {entity_id: item.id})
         SET m.summary = item.summary
         """
 
+    def _get_dependency_ids(self, item: Dict[str, Any]) -> Optional[List[str]]:
+        # A method summary goes stale when its own code analysis was regenerated
+        return [item['id']]
+
     def _get_processor_result(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Calls the appropriate method on the NodeSummaryProcessor.
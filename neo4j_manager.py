@@ -1,24 +1,57 @@
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from neo4j import GraphDatabase
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from neo4j import GraphDatabase, AsyncGraphDatabase, READ_ACCESS, WRITE_ACCESS
 
 logger = logging.getLogger(__name__)
 
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+def _row_values(record: Any) -> List[Any]:
+    """
+    Returns a record's values as a list. Rows of plain scalars are copied as is;
+    rows holding nodes, relationships or collections go through record.data(),
+    which converts graph types to plain values.
+    """
+    values = list(record)
+    if all(isinstance(value, _PLAIN_TYPES) for value in values):
+        return values
+    return list(record.data().values())
+
 class Neo4jManager:
     """
     Manages low-level Neo4j database operations and connection lifecycle.
     Provides generic query execution methods.
     """
-    def __init__(self, uri: str, user: str, password: str):
+    def __init__(self, uri: str, user: str, password: str, database: Optional[str] = None,
+                 pool_size: int = 50, acq_timeout: float = 30.0, max_lifetime: float = 3600.0):
         self.uri = uri
         self.user = user
         self.password = password
+        self.database = database  # None targets the server's default database
+        self.pool_size = pool_size
+        self.acq_timeout = acq_timeout
+        self.max_lifetime = max_lifetime
         self._driver = None
 
     def __enter__(self):
         """Establishes connection and returns self for use in 'with' statements."""
-        self._driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
-        self._driver.verify_connectivity() # Verify connection immediately
+        self._driver = GraphDatabase.driver(
+            self.uri,
+            auth=(self.user, self.password),
+            max_connection_pool_size=self.pool_size,
+            connection_acquisition_timeout=self.acq_timeout,
+            max_connection_lifetime=self.max_lifetime,
+            keep_alive=True,
+        )
+        try:
+            self._driver.verify_connectivity() # Verify connection immediately
+        except Exception:
+            # __exit__ is not called when __enter__ raises, so release the driver here
+            self._driver.close()
+            self._driver = None
+            raise
         logger.info(f"Neo4j connection established at {self.uri} with user {self.user}.")
         return self
 
@@ -43,21 +76,137 @@ class Neo4jManager:
             logger.error(f"Neo4j connection check failed: {e}")
             return False
 
+    def _session(self, access_mode: str):
+        """Opens a session on the configured database; naming it skips the home-database lookup."""
+        return self._driver.session(database=self.database, default_access_mode=access_mode)
+
     def execute_read_query(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Executes a read-only Cypher query and returns a list of result records."""
-        with self._driver.session() as session:
+        with self._session(READ_ACCESS) as session:
             result = session.run(cypher, parameters=params)
             return [record.data() for record in result]
 
+    def execute_read_query_tuples(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[tuple]:
+        """
+        Executes a read-only Cypher query and returns each record as a plain tuple of
+        its values, in RETURN order. Cheaper than building a dict per record.
+        """
+        with self._session(READ_ACCESS) as session:
+            result = session.run(cypher, parameters=params)
+            return [tuple(record.values()) for record in result]
+
+    def execute_read_query_single(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Executes a read-only Cypher query and returns only its first record, or None."""
+        with self._session(READ_ACCESS) as session:
+            record = session.run(cypher, parameters=params).single(strict=False)
+            return record.data() if record else None
+
+    def stream_read_query(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Executes a read-only Cypher query and yields result records as the driver
+        fetches them, so consumers can start work before the full result arrives.
+        """
+        with self._session(READ_ACCESS) as session:
+            result = session.run(cypher, parameters=params)
+            for record in result:
+                yield record.data()
+
     def execute_write_query(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> Any:
         """Executes a write Cypher query and returns the summary counters."""
-        with self._driver.session() as session:
+        with self._session(WRITE_ACCESS) as session:
             result = session.run(cypher, parameters=params)
             return result.consume().counters
 
+    @contextmanager
+    def session_scope(self) -> Iterator[Any]:
+        """
+        Yields one session for a sequence of writes, so a pass acquires a pooled
+        connection once instead of per query. Use with execute_write_tx.
+        """
+        with self._session(WRITE_ACCESS) as session:
+            yield session
+
+    def execute_write_tx(self, session: Any, cypher: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Executes a write Cypher query in its own managed transaction on the given
+        session (retried by the driver on transient errors) and returns the summary counters.
+        """
+        return session.execute_write(lambda tx: tx.run(cypher, parameters=params).consume().counters)
+
     def get_schema(self) -> List[Dict[str, Any]]:
         """Retrieves the current schema of the Neo4j database."""
-        with self._driver.session() as session:
+        with self._session(READ_ACCESS) as session:
             result = session.run("CALL db.schema.visualization()")
             return [record.data() for record in result]
             
+
+
+class AsyncNeo4jManager:
+    """
+    Asynchronous counterpart of Neo4jManager for callers running on an event loop,
+    such as the MCP server. One driver, and its connection pool, is kept for the
+    lifetime of the process and must be closed with close() on shutdown.
+    """
+    def __init__(self, uri: str, user: str, password: str, database: Optional[str] = None,
+                 pool_size: int = 50, acq_timeout: float = 30.0, max_lifetime: float = 3600.0):
+        self.uri = uri
+        self.user = user
+        self.database = database  # None targets the server's default database
+        self._driver = AsyncGraphDatabase.driver(
+            uri,
+            auth=(user, password),
+            max_connection_pool_size=pool_size,
+            connection_acquisition_timeout=acq_timeout,
+            max_connection_lifetime=max_lifetime,
+            keep_alive=True,
+        )
+        self._warm_up_task: Optional[asyncio.Future] = None
+
+    async def warm_up(self):
+        """
+        Opens the first pooled connection, once per process. Callers can await this
+        alongside other work so connection setup is not paid by their first query.
+        """
+        if self._warm_up_task is None:
+            self._warm_up_task = asyncio.ensure_future(self._driver.verify_connectivity())
+        try:
+            await asyncio.shield(self._warm_up_task)
+        except Exception as e:
+            # Retried by the next caller; the query that follows reports the error itself
+            self._warm_up_task = None
+            logger.warning(f"Neo4j connection warm-up failed: {e}")
+
+    async def execute_read_query(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Executes a read-only Cypher query and returns a list of result records."""
+        async with self._driver.session(database=self.database, default_access_mode=READ_ACCESS) as session:
+            result = await session.run(cypher, parameters=params)
+            return [record.data() async for record in result]
+
+    async def execute_read_query_single(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Executes a read-only Cypher query and returns only its first record, or None."""
+        async with self._driver.session(database=self.database, default_access_mode=READ_ACCESS) as session:
+            result = await session.run(cypher, parameters=params)
+            record = await result.single(strict=False)
+            return record.data() if record else None
+
+    async def execute_read_query_limited(self, cypher: str, max_rows: int,
+                                         params: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[List[Any]], bool]:
+        """
+        Executes a read-only Cypher query in a read transaction but fetches at most max_rows records.
+        Returns the column names, each record's values in column order, and
+        whether the result had more rows than that.
+        """
+        async def fetch_limited(tx) -> Tuple[List[str], List[Any]]:
+            result = await tx.run(cypher, parameters=params)
+            # One extra record tells whether the result was cut off; the rest is discarded
+            return list(await result.keys()), await result.fetch(max_rows + 1)
+
+        # A read transaction, so the server itself rejects any write the query attempts
+        async with self._driver.session(database=self.database, default_access_mode=READ_ACCESS) as session:
+            keys, records = await session.execute_read(fetch_limited)
+        return keys, [_row_values(record) for record in records[:max_rows]], len(records) > max_rows
+
+    async def close(self):
+        """Closes the driver and all pooled connections."""
+        await self._driver.close()
+        logger.info("Neo4j connection closed.")
@@ -1,5 +1,10 @@
+import functools
 import hashlib
 import logging
+import re
+import sqlite3
+import threading
+from concurrent.futures import Future
 from typing import Any, Dict, List, Optional
 
 from llm_client import LlmClient
@@ -9,6 +14,34 @@ from token_manager import TokenManager
 
 logger = logging.getLogger(__name__)
 
+# LLM responses are persisted next to the summary cache, so a rerun (e.g. after a
+# partial failure) replays every prompt it has already sent, including the
+# intermediate steps of iterative summaries.
+_RESPONSE_CACHE_FILE = "llm_responses.sqlite"
+
+
+def _code_hash(source_bytes: bytes) -> str:
+    """Content hash stored as a method's code_hash."""
+    return hashlib.blake2b(source_bytes, digest_size=16).hexdigest()
+
+
+def _legacy_code_hash(source_bytes: bytes) -> str:
+    """The MD5 code_hash written by earlier versions, accepted so they need no re-analysis."""
+    return hashlib.md5(source_bytes).hexdigest()
+
+
+# A sentence ends at ., ! or ? followed by whitespace and a capital letter
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z])")
+
+
+@functools.lru_cache(maxsize=65536)
+def _compact_summary(summary: str) -> str:
+    """
+    Returns the first sentence of a child summary. Used when a node's children
+    do not fit in one prompt, to cut the number and size of fold steps.
+    """
+    return _SENTENCE_END.split(summary.strip(), maxsplit=1)[0]
+
 
 class NodeSummaryProcessor:
     """
@@ -31,6 +64,107 @@ class NodeSummaryProcessor:
         self.prompt_manager = PromptManager()
         self.token_manager = TokenManager()
 
+        # Responses are only valid for the client and model that produced them
+        self._response_key_prefix = f"{type(llm_client).__name__}:{getattr(llm_client, 'model', '')}\0"
+        self._response_cache_lock = threading.Lock()
+        self._response_cache = self._open_response_cache()
+        # Prompts currently being sent, by response key, so duplicates wait instead of resending
+        self._pending_responses: Dict[bytes, Future] = {}
+
+    def _open_response_cache(self) -> Optional[sqlite3.Connection]:
+        """
+        Opens the persistent response cache, which maps a hash of the client, model
+        and prompt to the LLM response. Returns None if it cannot be opened.
+        """
+        cache_path = self.cache_manager.cache_dir / _RESPONSE_CACHE_FILE
+        try:
+            # Shared by the summarizer worker threads; every access holds _response_cache_lock
+            conn = sqlite3.connect(str(cache_path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS responses(key BLOB PRIMARY KEY, response TEXT)")
+            return conn
+        except sqlite3.Error as e:
+            logger.warning(f"LLM response cache disabled, could not open {cache_path}: {e}")
+            return None
+
+    def close(self):
+        """Closes the persistent response cache."""
+        if self._response_cache is not None:
+            with self._response_cache_lock:
+                self._response_cache.close()
+                self._response_cache = None
+
+    def _generate_summary(self, prompt: str) -> str:
+        """
+        Sends a prompt to the LLM, answering from the persistent response cache when
+        the same client and model have seen it before. Concurrent requests for the
+        same prompt (e.g. identical method bodies analyzed side by side) share one
+        LLM call. Empty responses (failed requests) are not cached.
+        """
+        key = hashlib.sha256((self._response_key_prefix + prompt).encode("utf-8")).digest()
+        with self._response_cache_lock:
+            pending = self._pending_responses.get(key)
+            is_owner = pending is None
+            if is_owner:
+                cached = self._lookup_response(key)
+                if cached is not None:
+                    return cached
+                pending = self._pending_responses[key] = Future()
+        if not is_owner:
+            return pending.result()
+
+        try:
+            response = self.llm_client.generate_summary(prompt)
+            self._store_response(key, response)
+            pending.set_result(response)
+            return response
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._response_cache_lock:
+                del self._pending_responses[key]
+
+    def _lookup_response(self, key: bytes) -> Optional[str]:
+        """
+        Returns the cached response for key, if any. Called with _response_cache_lock
+        held. A cache read error is logged and treated as a miss.
+        """
+        if self._response_cache is None:
+            return None
+        try:
+            row = self._response_cache.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read LLM response cache: {e}")
+            return None
+        return row[0] if row is not None else None
+
+    def _store_response(self, key: bytes, response: str):
+        """Persists a non-empty response under key."""
+        if not response or self._response_cache is None:
+            return
+        try:
+            with self._response_cache_lock:
+                self._response_cache.execute(
+                    "INSERT OR REPLACE INTO responses(key, response) VALUES (?, ?)", (key, response)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not store LLM response in cache: {e}")
+
+    def _get_dependency_summaries(self, dependency_ids: List[str]) -> List[str]:
+        """
+        Returns the cached summaries of the given dependencies, in order,
+        skipping those that have none. All entries are fetched in one lookup.
+        """
+        node_caches = self.cache_manager.get_node_caches_batch(dependency_ids)
+        return [
+            summary
+            for summary in (
+                node_caches[dep_id].get("summary") for dep_id in dependency_ids
+            )
+            if summary
+        ]
+
     def get_method_code_analysis(
         self, node_data: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
@@ -43,7 +177,8 @@ class NodeSummaryProcessor:
         if not source_code:
             return None
 
-        new_hash = hashlib.md5(source_code.encode("utf-8")).hexdigest()
+        source_bytes = source_code.encode("utf-8")
+        new_hash = _code_hash(source_bytes)
         db_analysis = node_data.get("db_analysis")
         db_hash = node_data.get("db_hash")
 
@@ -58,14 +193,30 @@ class NodeSummaryProcessor:
 
         # 2. Check Cache state (restorable)
         cached_node = self.cache_manager.get_node_cache(node_id)
-        if (
-            cached_node.get("code_hash") == new_hash
-            and cached_node.get("code_analysis")
-        ):
+        cached_analysis = cached_node.get("code_analysis")
+        if cached_analysis and cached_node.get("code_hash") == new_hash:
+            return {
+                "status": "restored",
+                "id": node_id,
+                "code_analysis": cached_analysis,
+                "code_hash": new_hash,
+            }
+
+        # An analysis stored under the old hash is still valid; it is written
+        # back with the new hash, without an LLM call.
+        legacy_hash = _legacy_code_hash(source_bytes)
+        if db_analysis and db_hash == legacy_hash:
+            return {
+                "status": "restored",
+                "id": node_id,
+                "code_analysis": db_analysis,
+                "code_hash": new_hash,
+            }
+        if cached_analysis and cached_node.get("code_hash") == legacy_hash:
             return {
                 "status": "restored",
                 "id": node_id,
-                "code_analysis": cached_node["code_analysis"],
+                "code_analysis": cached_analysis,
                 "code_hash": new_hash,
             }
 
@@ -102,7 +253,7 @@ class NodeSummaryProcessor:
                 is_last_chunk=(i == len(chunks) - 1),
                 running_summary=running_summary,
             )
-            new_summary = self.llm_client.generate_summary(prompt)
+            new_summary = self._generate_summary(prompt)
             if not new_summary:
                 logger.error(
                     f"Iterative code analysis failed at chunk {i + 1}."
@@ -122,43 +273,33 @@ class NodeSummaryProcessor:
         node_id = node_data["id"]
         db_summary = node_data.get("db_summary")
 
-        is_stale = self.cache_manager.was_dependency_changed([node_id])
+        is_stale = node_data.get("is_stale")
+        if is_stale is None:
+            is_stale = self.cache_manager.was_dependency_changed([node_id])
 
         # 1. Check DB state
         if db_summary and not is_stale:
             return {"status": "unchanged", "id": node_id, "summary": db_summary}
 
         # 2. Check Cache state
-        cached_summary = self.cache_manager.get_node_cache(node_id).get(
-            "summary"
-        )
+        cached_node = self.cache_manager.get_node_cache(node_id)
+        cached_summary = cached_node.get("summary")
         if cached_summary and not is_stale:
             return {"status": "restored", "id": node_id, "summary": cached_summary}
 
         # 3. Regenerate
-        code_analysis = self.cache_manager.get_node_cache(node_id).get(
-            "code_analysis"
-        )
+        code_analysis = cached_node.get("code_analysis")
         if not code_analysis:
             return None  # Cannot proceed without code analysis
 
         # Fetch caller and callee summaries from the cache
-        caller_summaries = [
-            self.cache_manager.get_node_cache(dep_id).get("summary")
-            for dep_id in node_data.get("callers", [])
-        ]
-        caller_summaries = [s for s in caller_summaries if s]
+        caller_summaries = self._get_dependency_summaries(node_data.get("callers", []))
 
-        callee_summaries = [
-            self.cache_manager.get_node_cache(dep_id).get("summary")
-            for dep_id in node_data.get("callees", [])
-        ]
-        callee_summaries = [s for s in callee_summaries if s]
+        callee_summaries = self._get_dependency_summaries(node_data.get("callees", []))
 
         # Check if the total context fits into a single prompt
-        full_context = " ".join([code_analysis] + caller_summaries + callee_summaries)
         if (
-            self.token_manager.get_token_count(full_context)
+            self.token_manager.get_total_token_count([code_analysis], caller_summaries, callee_summaries)
             < self.token_manager.max_context_token_size
         ):
             prompt = self.prompt_manager.get_method_summary_prompt(
@@ -167,7 +308,7 @@ class NodeSummaryProcessor:
                 caller_summaries,
                 callee_summaries,
             )
-            new_summary = self.llm_client.generate_summary(prompt)
+            new_summary = self._generate_summary(prompt)
         else:
             logger.info(
                 f"Context for method '{node_data['name']}' is too large, "
@@ -207,7 +348,7 @@ class NodeSummaryProcessor:
             prompt = self.prompt_manager.get_iterative_method_summary_prompt(
                 running_summary, chunk, "callers"
             )
-            new_summary = self.llm_client.generate_summary(prompt)
+            new_summary = self._generate_summary(prompt)
             if not new_summary:
                 logger.error(
                     f"Iterative method summary (callers) failed at chunk {i+1}."
@@ -223,7 +364,7 @@ class NodeSummaryProcessor:
             prompt = self.prompt_manager.get_iterative_method_summary_prompt(
                 running_summary, chunk, "callees"
             )
-            new_summary = self.llm_client.generate_summary(prompt)
+            new_summary = self._generate_summary(prompt)
             if not new_summary:
                 logger.error(
                     f"Iterative method summary (callees) failed at chunk {i+1}."
@@ -246,7 +387,9 @@ class NodeSummaryProcessor:
         member_ids = node_data.get("member_ids", [])
         dependency_ids = parent_ids + member_ids
 
-        is_stale = self.cache_manager.was_dependency_changed(dependency_ids)
+        is_stale = node_data.get("is_stale")
+        if is_stale is None:
+            is_stale = self.cache_manager.was_dependency_changed(dependency_ids)
 
         # 1. Check DB state
         if db_summary and not is_stale:
@@ -258,22 +401,13 @@ class NodeSummaryProcessor:
             return {"status": "restored", "id": node_id, "summary": cached_summary}
 
         # 3. Regenerate
-        parent_summaries = [
-            self.cache_manager.get_node_cache(dep_id).get("summary")
-            for dep_id in parent_ids
-        ]
-        parent_summaries = [s for s in parent_summaries if s]
+        parent_summaries = self._get_dependency_summaries(parent_ids)
 
-        member_summaries = [
-            self.cache_manager.get_node_cache(dep_id).get("summary")
-            for dep_id in member_ids
-        ]
-        member_summaries = [s for s in member_summaries if s]
+        member_summaries = self._get_dependency_summaries(member_ids)
 
         # Check if the total context fits into a single prompt
-        full_context = " ".join(parent_summaries + member_summaries)
         if (
-            self.token_manager.get_token_count(full_context)
+            self.token_manager.get_total_token_count(parent_summaries, member_summaries)
             < self.token_manager.max_context_token_size
         ):
             prompt = self.prompt_manager.get_type_summary_prompt(
@@ -282,7 +416,7 @@ class NodeSummaryProcessor:
                 parent_summaries,
                 member_summaries,
             )
-            new_summary = self.llm_client.generate_summary(prompt)
+            new_summary = self._generate_summary(prompt)
         else:
             logger.info(
                 f"Context for type '{node_data['name']}' is too large, "
@@ -315,14 +449,15 @@ class NodeSummaryProcessor:
             f"A {node_type} named '{node_name}' that serves a purpose to be defined by its contents."
         )
 
+        # Only the gist of each child is folded in
         child_chunks = self.token_manager.chunk_summaries_by_tokens(
-            child_summaries
+            [_compact_summary(summary) for summary in child_summaries]
         )
         for i, chunk in enumerate(child_chunks):
             prompt = self.prompt_manager.get_iterative_hierarchical_prompt(
                 node_type, node_name, running_summary, chunk
             )
-            new_summary = self.llm_client.generate_summary(prompt)
+            new_summary = self._generate_summary(prompt)
             if not new_summary:
                 logger.error(
                     f"Iterative hierarchical summary for {node_type} '{node_name}' "
@@ -355,7 +490,7 @@ class NodeSummaryProcessor:
             prompt = self.prompt_manager.get_iterative_type_summary_prompt(
                 type_name, type_label, running_summary, chunk, "parents"
             )
-            new_summary = self.llm_client.generate_summary(prompt)
+            new_summary = self._generate_summary(prompt)
             if not new_summary:
                 logger.error(
                     f"Iterative type summary (parents) failed at chunk {i+1}."
@@ -363,13 +498,15 @@ class NodeSummaryProcessor:
                 return None
             running_summary = new_summary
 
-        # Iteratively fold in member context
-        member_chunks = self.token_manager.chunk_summaries_by_tokens(member_summaries)
+        # Iteratively fold in member context; only the gist of each member is used
+        member_chunks = self.token_manager.chunk_summaries_by_tokens(
+            [_compact_summary(summary) for summary in member_summaries]
+        )
         for i, chunk in enumerate(member_chunks):
             prompt = self.prompt_manager.get_iterative_type_summary_prompt(
                 type_name, type_label, running_summary, chunk, "members"
             )
-            new_summary = self.llm_client.generate_summary(prompt)
+            new_summary = self._generate_summary(prompt)
             if not new_summary:
                 logger.error(
                     f"Iterative type summary (members) failed at chunk {i+1}."
@@ -395,7 +532,9 @@ class NodeSummaryProcessor:
         db_summary = node_data.get("db_summary")
         dependency_ids = node_data.get("dependency_ids", [])
 
-        is_stale = self.cache_manager.was_dependency_changed(dependency_ids)
+        is_stale = node_data.get("is_stale")
+        if is_stale is None:
+            is_stale = self.cache_manager.was_dependency_changed(dependency_ids)
 
         # 1. Check DB state
         if db_summary and not is_stale:
@@ -413,19 +552,14 @@ class NodeSummaryProcessor:
             }
 
         # 3. Regenerate
-        child_summaries = [
-            self.cache_manager.get_node_cache(dep_id).get("summary")
-            for dep_id in dependency_ids
-        ]
-        child_summaries = [s for s in child_summaries if s]
+        child_summaries = self._get_dependency_summaries(dependency_ids)
 
         if not child_summaries:
             return None  # Cannot generate a parent summary without child context
 
         # Check if the total context fits into a single prompt
-        full_context = " ".join(child_summaries)
         if (
-            self.token_manager.get_token_count(full_context)
+            self.token_manager.get_total_token_count(child_summaries)
             < self.token_manager.max_context_token_size
         ):
             context = "; ".join(child_summaries)
@@ -437,7 +571,7 @@ class NodeSummaryProcessor:
             prompt = self.prompt_manager.get_hierarchical_summary_prompt(
                 node_type, node_name, context
             )
-            new_summary = self.llm_client.generate_summary(prompt)
+            new_summary = self._generate_summary(prompt)
         else:
             node_name = (
                 node_data.get("path")
@@ -452,7 +586,6 @@ class NodeSummaryProcessor:
                 node_data, node_type, child_summaries
             )
 
-        new_summary = self.llm_client.generate_summary(prompt)
         if new_summary:
             return {
                 "status": "regenerated",
@@ -475,7 +608,9 @@ class NodeSummaryProcessor:
         class_deps = node_data.get("class_deps", [])
         dependency_ids = source_deps + class_deps
 
-        is_stale = self.cache_manager.was_dependency_changed(dependency_ids)
+        is_stale = node_data.get("is_stale")
+        if is_stale is None:
+            is_stale = self.cache_manager.was_dependency_changed(dependency_ids)
 
         if db_summary and not is_stale:
             return {"status": "unchanged", "id": node_id, "summary": db_summary}
@@ -485,27 +620,18 @@ class NodeSummaryProcessor:
             return {"status": "restored", "id": node_id, "summary": cached_summary}
 
         # Regenerate: Fetch summaries for both contexts
-        source_summaries = [
-            self.cache_manager.get_node_cache(dep_id).get("summary")
-            for dep_id in source_deps
-        ]
-        source_summaries = [s for s in source_summaries if s]
+        source_summaries = self._get_dependency_summaries(source_deps)
 
-        class_summaries = [
-            self.cache_manager.get_node_cache(dep_id).get("summary")
-            for dep_id in class_deps
-        ]
-        class_summaries = [s for s in class_summaries if s]
+        class_summaries = self._get_dependency_summaries(class_deps)
 
-        full_context = " ".join(source_summaries + class_summaries)
         if (
-            self.token_manager.get_token_count(full_context)
+            self.token_manager.get_total_token_count(source_summaries, class_summaries)
             < self.token_manager.max_context_token_size
         ):
             prompt = self.prompt_manager.get_project_summary_prompt(
                 node_data["name"], "; ".join(source_summaries), "; ".join(class_summaries)
             )
-            new_summary = self.llm_client.generate_summary(prompt)
+            new_summary = self._generate_summary(prompt)
         else:
             logger.info(
                 f"Context for project '{node_data['name']}' is too large, "
@@ -540,7 +666,7 @@ class NodeSummaryProcessor:
             prompt = self.prompt_manager.get_iterative_project_summary_prompt(
                 project_name, running_summary, chunk, "source"
             )
-            new_summary = self.llm_client.generate_summary(prompt)
+            new_summary = self._generate_summary(prompt)
             if not new_summary:
                 logger.error(f"Iterative project summary (source) failed at chunk {i+1}.")
                 return None
@@ -552,7 +678,7 @@ class NodeSummaryProcessor:
             prompt = self.prompt_manager.get_iterative_project_summary_prompt(
                 project_name, running_summary, chunk, "class"
             )
-            new_summary = self.llm_client.generate_summary(prompt)
+            new_summary = self._generate_summary(prompt)
             if not new_summary:
                 logger.error(f"Iterative project summary (class) failed at chunk {i+1}.")
                 return None
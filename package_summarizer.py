@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List
 from collections import defaultdict
 from base_summarizer import BaseSummarizer
 from node_summary_processor import NodeSummaryProcessor
@@ -26,14 +26,25 @@ class PackageSummarizer(BaseSummarizer):
         Executes the package summarization pass in two phases:
         1. Summarize internal packages from the bottom up.
         2. Summarize the Artifact roots themselves.
+        The items of both phases are fetched with a single query.
         """
         logger.info(f"--- Starting Pass: {self.__class__.__name__} ---")
         total_updated_count = 0
 
-        updated_in_phase1 = self._summarize_internal_packages()
+        # Rows are bucketed as the driver yields them, so the full result is never held twice.
+        # A package's depth is the number of segments in its FQN.
+        packages_by_depth = defaultdict(list)
+        artifact_items = []
+        for item in self._get_items_to_summarize():
+            if item['isInternalPackage']:
+                packages_by_depth[item['fqn'].count('.') + 1].append(item)
+            else:
+                artifact_items.append(item)
+
+        updated_in_phase1 = self._summarize_internal_packages(packages_by_depth)
         total_updated_count += updated_in_phase1
 
-        updated_in_phase2 = self._summarize_artifact_roots()
+        updated_in_phase2 = self._summarize_artifact_roots(artifact_items)
         total_updated_count += updated_in_phase2
 
         logger.info(
@@ -42,33 +53,35 @@ class PackageSummarizer(BaseSummarizer):
         )
         return total_updated_count
 
-    def _summarize_internal_packages(self) -> int:
-        """Processes all :Package nodes within :Artifact containers."""
-        logger.info("Phase 1: Summarizing internal packages.")
+    def _get_items_to_summarize(self) -> Iterator[Dict[str, Any]]:
+        """
+        Fetches the unsummarized internal packages and Artifact roots. 'isInternalPackage' tells the two apart; a node that
+        is both a package and an Artifact is summarized as a package.
+        """
         query = """
-        MATCH (a:Artifact)-[:CONTAINS_CLASS*]->(p:Package)
-        WHERE p.fqn IS NOT NULL AND p.summary IS NULL
-        WITH p, size(split(p.fqn, '.')) AS depth
-        OPTIONAL MATCH (p)-[:CONTAINS_CLASS]->(child)
+        MATCH (n)
+        WHERE (n:Package OR n:Artifact) AND n.summary IS NULL
+        WITH n, (n:Package AND n.fqn IS NOT NULL AND EXISTS { (:Artifact)-[:CONTAINS_CLASS*]->(n) }) AS isInternalPackage
+        WHERE isInternalPackage OR n:Artifact
+        OPTIONAL MATCH (n)-[:CONTAINS_CLASS]->(child)
         WHERE child:Package OR child:Type
         RETURN
-            p.entity_id AS id,
-            p.fqn AS fqn,
-            p.summary AS db_summary,
-            collect(DISTINCT child.entity_id) AS dependency_ids,
-            depth
-        ORDER BY depth DESC
+            isInternalPackage,
+            n.entity_id AS id,
+            CASE WHEN isInternalPackage THEN n.fqn END AS fqn,
+            CASE WHEN isInternalPackage THEN null ELSE n.fileName END AS path,
+            n.summary AS db_summary,
+            collect(DISTINCT child.entity_id) AS dependency_ids
         """
-        items_to_process = self.neo4j_manager.execute_read_query(query)
-        
-        if not items_to_process:
+        return self.neo4j_manager.stream_read_query(query)
+
+    def _summarize_internal_packages(self, items_by_depth: Dict[int, List[Dict[str, Any]]]) -> int:
+        """Processes all :Package nodes within :Artifact containers, grouped by FQN depth."""
+        logger.info("Phase 1: Summarizing internal packages.")
+        if not items_by_depth:
             logger.info("No internal packages to summarize.")
             return 0
 
-        items_by_depth = defaultdict(list)
-        for item in items_to_process:
-            items_by_depth[item['depth']].append(item)
-
         updated_count = 0
         for depth in sorted(items_by_depth.keys(), reverse=True):
             batch = items_by_depth[depth]
@@ -77,22 +90,9 @@ class PackageSummarizer(BaseSummarizer):
         
         return updated_count
 
-    def _summarize_artifact_roots(self) -> int:
+    def _summarize_artifact_roots(self, items_to_process: List[Dict[str, Any]]) -> int:
         """Processes the root :Artifact nodes."""
         logger.info("Phase 2: Summarizing Artifact roots.")
-        query = """
-        MATCH (a:Artifact)
-        WHERE a.summary IS NULL
-        OPTIONAL MATCH (a)-[:CONTAINS_CLASS]->(child)
-        WHERE child:Package OR child:Type
-        RETURN
-            a.entity_id AS id,
-            a.fileName AS path,
-            a.summary AS db_summary,
-            collect(DISTINCT child.entity_id) AS dependency_ids
-        """
-        items_to_process = self.neo4j_manager.execute_read_query(query)
-
         if not items_to_process:
             logger.info("No Artifact roots to summarize.")
             return 0
@@ -102,8 +102,8 @@ class PackageSummarizer(BaseSummarizer):
     def _get_update_query(self) -> str:
         return """
         UNWIND $updates AS item
-        MATCH (p)
-        WHERE p.entity_id = item.id
+        // Packages and Artifact roots are both :Entity, so one seek covers both kinds
+        MATCH (p:Entity {entity_id: item.id})
         SET p.summary = item.summary
         """
 
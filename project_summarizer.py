@@ -63,10 +63,13 @@ class ProjectSummarizer(BaseSummarizer):
     def _get_update_query(self) -> str:
         return """
         UNWIND $updates AS item
-        MATCH (p:Project {entity_id: item.id})
+        MATCH (p:Entity:Project {entity_id: item.id})
         SET p.summary = item.summary
         """
 
+    def _get_dependency_ids(self, item: Dict[str, Any]) -> Optional[List[str]]:
+        return item["source_deps"] + item["class_deps"]
+
     def _get_processor_result(
         self, item: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
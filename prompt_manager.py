@@ -3,6 +3,155 @@ This module centralizes all LLM prompt templates for the GraphRAG system.
 """
 from typing import List
 
+# Templates are built once at import; each call only substitutes its fields.
+_METHOD_ANALYSIS_SINGLE_CHUNK = (
+    "Summarize the purpose of this method based on its code. "
+    "Provide a concise, one-paragraph technical analysis. "
+    "Do not respond with your reasoning process, only the summary."
+    "\n\n```\n{chunk}\n```"
+)
+_METHOD_ANALYSIS_FIRST_CHUNK = (
+    "Summarize this code, which is the beginning of a larger "
+    "method. Provide a concise, one-paragraph technical analysis. "
+    "Do not respond with your reasoning process, only the summary."
+    "\n\n```\n{chunk}\n```"
+)
+_METHOD_ANALYSIS_NEXT_CHUNK = (
+    "The summary of the first part of a large method so far is: \n"
+    "'{running_summary}'\n\n"
+    "Here is the next part of the code:\n```\n{chunk}\n```\n\n"
+    "{position_prompt}\n\n"
+    "Please provide a new, single-paragraph summary that combines "
+    "the previous summary with this new code. Do not respond with "
+    "your reasoning process, only the summary."
+)
+_METHOD_BODY_ENDS = "This is the end of the method body."
+_METHOD_BODY_CONTINUES = "The method body continues after this code."
+
+_METHOD_SUMMARY = (
+    "A method named '{method_name}' is technically analyzed as: "
+    "'{code_analysis}'.\n"
+    "It is called by other methods with these responsibilities: "
+    "[{caller_text}].\n"
+    "It calls other methods to accomplish these tasks: "
+    "[{callee_text}].\n\n"
+    "Based on this full context, what is the high-level purpose of "
+    "this method in the overall system? Describe it in a concise "
+    "paragraph. Do not respond with your reasoning process, only the summary."
+)
+
+_ITERATIVE_METHOD_SUMMARY = {
+    "callers": (
+        "A method's purpose is summarized as: "
+        "'{running_summary}'.\n"
+        "It is used by other methods with the following responsibilities: "
+        "[{relation_chunk}].\n\n"
+        "Refine the summary of the method's role in relation to its callers. "
+        "Provide a new, single-paragraph summary. Do not respond with "
+        "your reasoning process, only the summary."
+    ),
+    "callees": (
+        "So far, a method's role is summarized as: "
+        "'{running_summary}'.\n"
+        "It accomplishes this by calling other methods for these purposes: "
+        "[{relation_chunk}].\n\n"
+        "Provide a final, comprehensive summary of the method's "
+        "overall purpose based on its callees. Provide a new, "
+        "single-paragraph summary. Do not respond with your reasoning "
+        "process, only the summary."
+    ),
+}
+
+# The type prompt is assembled from fragments so each summary list is copied into it once
+_TYPE_SUMMARY_HEAD = "A {type_label} named '{type_name}' is defined. "
+_TYPE_PARENTS_OPEN = "It inherits from or implements the following types: ["
+_TYPE_MEMBERS_OPEN = "It contains members (methods, fields) with these responsibilities: ["
+_TYPE_LIST_CLOSE = "]."
+_TYPE_SUMMARY_TAIL = (
+    "\n\n"
+    "Based on its inheritance and members, what is the primary responsibility and role of the '{type_name}' {type_label} in the system? "
+    "Describe it in a concise paragraph. Do not respond with your reasoning process, only the summary."
+)
+
+_ITERATIVE_TYPE_SUMMARY = {
+    "parents": (
+        "The summary for the {type_label} '{type_name}' is currently: '{running_summary}'.\n"
+        "It inherits from or implements types with these roles: "
+        "[{relation_chunk}].\n\n"
+        "Refine the summary to include the role of its inheritance. "
+        "Provide a new, single-paragraph summary. Do not respond with "
+        "your reasoning process, only the summary."
+    ),
+    "members": (
+        "So far, the role of the {type_label} '{type_name}' is summarized as: '{running_summary}'.\n"
+        "It implements members (methods, fields) to perform these functions: "
+        "[{relation_chunk}].\n\n"
+        "Provide a final, comprehensive summary of the type's overall purpose. "
+        "Provide a new, single-paragraph summary. Do not respond with "
+        "your reasoning process, only the summary."
+    ),
+}
+
+# How each hierarchical node type is referred to in its prompt
+_HIERARCHICAL_NOUNS = {
+    "SourceFile": "source file",
+    "Directory": "directory",
+    "Package": "package",
+    "Project": "project",
+}
+_HIERARCHICAL_SUMMARY = """Based on the following context, provide a concise summary for the {noun} named '{node_name}'.
+Context:
+{context}
+Summary:
+"""
+
+_ITERATIVE_HIERARCHICAL_SUMMARY = (
+    "The summary for the {node_type} '{node_name}' is currently: '{running_summary}'.\n"
+    "It contains child components with the following responsibilities: "
+    "[{child_summaries_chunk}].\n\n"
+    "Refine the summary for the {node_type} '{node_name}' based on this new information. "
+    "Provide a new, single-paragraph summary. Do not respond with "
+    "your reasoning process, only the summary."
+)
+
+_PROJECT_SUMMARY = (
+    "Provide a high-level summary for the project named '{project_name}'. "
+    "Structure your response in two distinct paragraphs as follows:\n\n"
+    "**Source Code Overview:**\n"
+    "Based on the summaries of its main source directories, describe the "
+    "core purpose and functionality of the project's own source code. "
+    "This is the context from the source code:\n"
+    "[{source_context}]\n\n"
+    "{class_part}"
+    "\n\nDo not respond with your reasoning process, only the two-paragraph summary."
+)
+_PROJECT_CLASS_CONTEXT = (
+    "**Package and Dependency Overview:**\n"
+    "Based on the summaries of its compiled packages and dependencies (JARs), "
+    "describe the key libraries, frameworks, and external components the "
+    "project relies on. This is the context from its dependencies:\n"
+    "[{class_context}]"
+)
+
+_ITERATIVE_PROJECT_SUMMARY = {
+    "source": (
+        "The summary for the project '{project_name}' so far is: '{running_summary}'.\n"
+        "Here is a new chunk of context from its source code directories: "
+        "[{context_chunk}].\n\n"
+        "Refine the 'Source Code Overview' paragraph of the summary based on this new information. "
+        "Provide a new, complete two-paragraph summary, enhancing the first paragraph and preserving the second if it exists. "
+        "Do not respond with your reasoning process, only the summary."
+    ),
+    "class": (
+        "The summary for the project '{project_name}' so far is: '{running_summary}'.\n"
+        "Here is a new chunk of context from its packages and dependencies: "
+        "[{context_chunk}].\n\n"
+        "Add or refine the 'Package and Dependency Overview' paragraph of the summary based on this new information. "
+        "Provide a new, complete two-paragraph summary, preserving the first paragraph and enhancing the second. "
+        "Do not respond with your reasoning process, only the summary."
+    ),
+}
+
 
 class PromptManager:
     """
@@ -21,37 +170,14 @@ class PromptManager:
         Handles first, middle, and last chunks for iterative processing.
         """
         if is_first_chunk:
-            if is_last_chunk:
-                # The entire method fits in one chunk
-                return (
-                    "Summarize the purpose of this method based on its code. "
-                    "Provide a concise, one-paragraph technical analysis. "
-                    "Do not respond with your reasoning process, only the summary."
-                    "\n\n```\n{chunk}\n```"
-                )
-            else:
-                # This is the first chunk of a larger method
-                return (
-                    "Summarize this code, which is the beginning of a larger "
-                    "method. Provide a concise, one-paragraph technical analysis. "
-                    "Do not respond with your reasoning process, only the summary."
-                    "\n\n```\n{chunk}\n```"
-                )
-        else:
-            position_prompt = (
-                "This is the end of the method body."
-                if is_last_chunk
-                else "The method body continues after this code."
-            )
-            return (
-                "The summary of the first part of a large method so far is: \n"
-                f"'{running_summary}'\n\n"
-                f"Here is the next part of the code:\n```\n{chunk}\n```\n\n"
-                f"{position_prompt}\n\n"
-                "Please provide a new, single-paragraph summary that combines "
-                "the previous summary with this new code. Do not respond with "
-                "your reasoning process, only the summary."
-            )
+            # A single chunk means the entire method fits in one prompt
+            template = _METHOD_ANALYSIS_SINGLE_CHUNK if is_last_chunk else _METHOD_ANALYSIS_FIRST_CHUNK
+            return template.format(chunk=chunk)
+        return _METHOD_ANALYSIS_NEXT_CHUNK.format(
+            running_summary=running_summary,
+            chunk=chunk,
+            position_prompt=_METHOD_BODY_ENDS if is_last_chunk else _METHOD_BODY_CONTINUES,
+        )
 
     def get_method_summary_prompt(
         self,
@@ -64,19 +190,11 @@ class PromptManager:
         Generates the prompt for a contextual summary of a method's role.
         This is the single-shot version for when context fits in the window.
         """
-        caller_text = "; ".join(callers) if callers else "None"
-        callee_text = "; ".join(callees) if callees else "None"
-
-        return (
-            f"A method named '{method_name}' is technically analyzed as: "
-            f"'{code_analysis}'.\n"
-            "It is called by other methods with these responsibilities: "
-            f"[{caller_text}].\n"
-            "It calls other methods to accomplish these tasks: "
-            f"[{callee_text}].\n\n"
-            "Based on this full context, what is the high-level purpose of "
-            f"this method in the overall system? Describe it in a concise "
-            "paragraph. Do not respond with your reasoning process, only the summary."
+        return _METHOD_SUMMARY.format(
+            method_name=method_name,
+            code_analysis=code_analysis,
+            caller_text="; ".join(callers) if callers else "None",
+            callee_text="; ".join(callees) if callees else "None",
         )
 
     def get_iterative_method_summary_prompt(
@@ -92,29 +210,10 @@ class PromptManager:
             relation_chunk: A chunk of caller or callee summaries.
             relation_type: Either 'callers' or 'callees'.
         """
-        if relation_type == "callers":
-            return (
-                "A method's purpose is summarized as: "
-                f"'{running_summary}'.\n"
-                "It is used by other methods with the following responsibilities: "
-                f"[{relation_chunk}].\n\n"
-                "Refine the summary of the method's role in relation to its callers. "
-                "Provide a new, single-paragraph summary. Do not respond with "
-                "your reasoning process, only the summary."
-            )
-        elif relation_type == "callees":
-            return (
-                "So far, a method's role is summarized as: "
-                f"'{running_summary}'.\n"
-                "It accomplishes this by calling other methods for these purposes: "
-                f"[{relation_chunk}].\n\n"
-                "Provide a final, comprehensive summary of the method's "
-                "overall purpose based on its callees. Provide a new, "
-                "single-paragraph summary. Do not respond with your reasoning "
-                "process, only the summary."
-            )
-        else:
+        template = _ITERATIVE_METHOD_SUMMARY.get(relation_type)
+        if template is None:
             raise ValueError(f"Unknown relation_type: {relation_type}")
+        return template.format(running_summary=running_summary, relation_chunk=relation_chunk)
 
     def get_type_summary_prompt(
         self, type_name: str, type_label: str, parent_summaries: List[str], member_summaries: List[str]
@@ -123,22 +222,14 @@ class PromptManager:
         Generates the prompt for a holistic summary of a type (class, interface, etc.).
         This is the single-shot version for when context fits in the window.
         """
-        parent_text = (
-            f"It inherits from or implements the following types: [{'; '.join(parent_summaries)}]."
-            if parent_summaries
-            else ""
-        )
-        member_text = (
-            f"It contains members (methods, fields) with these responsibilities: [{'; '.join(member_summaries)}]."
-            if member_summaries
-            else ""
-        )
-
-        return (
-            f"A {type_label} named '{type_name}' is defined. {parent_text} {member_text}\n\n"
-            f"Based on its inheritance and members, what is the primary responsibility and role of the '{type_name}' {type_label} in the system? "
-            "Describe it in a concise paragraph. Do not respond with your reasoning process, only the summary."
-        )
+        fragments = [_TYPE_SUMMARY_HEAD.format(type_label=type_label, type_name=type_name)]
+        if parent_summaries:
+            fragments += (_TYPE_PARENTS_OPEN, "; ".join(parent_summaries), _TYPE_LIST_CLOSE)
+        fragments.append(" ")
+        if member_summaries:
+            fragments += (_TYPE_MEMBERS_OPEN, "; ".join(member_summaries), _TYPE_LIST_CLOSE)
+        fragments.append(_TYPE_SUMMARY_TAIL.format(type_label=type_label, type_name=type_name))
+        return "".join(fragments)
 
     def get_iterative_type_summary_prompt(
         self,
@@ -151,26 +242,12 @@ class PromptManager:
         """
         Generates a prompt for iteratively refining a type summary.
         """
-        if relation_type == "parents":
-            return (
-                f"The summary for the {type_label} '{type_name}' is currently: '{running_summary}'.\n"
-                "It inherits from or implements types with these roles: "
-                f"[{relation_chunk}].\n\n"
-                "Refine the summary to include the role of its inheritance. "
-                "Provide a new, single-paragraph summary. Do not respond with "
-                "your reasoning process, only the summary."
-            )
-        elif relation_type == "members":
-            return (
-                f"So far, the role of the {type_label} '{type_name}' is summarized as: '{running_summary}'.\n"
-                "It implements members (methods, fields) to perform these functions: "
-                f"[{relation_chunk}].\n\n"
-                "Provide a final, comprehensive summary of the type's overall purpose. "
-                "Provide a new, single-paragraph summary. Do not respond with "
-                "your reasoning process, only the summary."
-            )
-        else:
+        template = _ITERATIVE_TYPE_SUMMARY.get(relation_type)
+        if template is None:
             raise ValueError(f"Unknown relation_type for type summary: {relation_type}")
+        return template.format(
+            type_label=type_label, type_name=type_name, running_summary=running_summary, relation_chunk=relation_chunk
+        )
 
     def get_hierarchical_summary_prompt(
         self, node_type: str, node_name: str, context: str
@@ -178,23 +255,14 @@ class PromptManager:
         """
         Generates a prompt for a single-shot hierarchical summary.
         """
-        prompts = {
-            "SourceFile": f"Based on the following context, provide a concise summary for the source file named '{node_name}'.",
-            "Directory": f"Based on the following context, provide a concise summary for the directory named '{node_name}'.",
-            "Package": f"Based on the following context, provide a concise summary for the package named '{node_name}'.",
-            "Project": f"Based on the following context, provide a concise summary for the project named '{node_name}'.",
-        }
-        if node_type not in prompts:
+        noun = _HIERARCHICAL_NOUNS.get(node_type)
+        if noun is None:
             raise ValueError(f"Unknown node_type for hierarchical summary: {node_type}")
         
         if not context:
             return f"Purpose of {node_type} '{node_name}' is unclear due to missing context."
 
-        return f"""{prompts[node_type]}
-Context:
-{context}
-Summary:
-"""
+        return _HIERARCHICAL_SUMMARY.format(noun=noun, node_name=node_name, context=context)
 
     def get_iterative_hierarchical_prompt(
         self,
@@ -206,13 +274,11 @@ Summary:
         """
         Generates a prompt for iteratively refining a hierarchical summary.
         """
-        return (
-            f"The summary for the {node_type} '{node_name}' is currently: '{running_summary}'.\n"
-            "It contains child components with the following responsibilities: "
-            f"[{child_summaries_chunk}].\n\n"
-            f"Refine the summary for the {node_type} '{node_name}' based on this new information. "
-            "Provide a new, single-paragraph summary. Do not respond with "
-            "your reasoning process, only the summary."
+        return _ITERATIVE_HIERARCHICAL_SUMMARY.format(
+            node_type=node_type,
+            node_name=node_name,
+            running_summary=running_summary,
+            child_summaries_chunk=child_summaries_chunk,
         )
 
     def get_project_summary_prompt(
@@ -221,27 +287,8 @@ Summary:
         """
         Generates a prompt for a dual-context project summary.
         """
-        prompt = (
-            f"Provide a high-level summary for the project named '{project_name}'. "
-            "Structure your response in two distinct paragraphs as follows:\n\n"
-            "**Source Code Overview:**\n"
-            "Based on the summaries of its main source directories, describe the "
-            "core purpose and functionality of the project's own source code. "
-            "This is the context from the source code:\n"
-            f"[{source_context}]\n\n"
-        )
-
-        if class_context:
-            prompt += (
-                "**Package and Dependency Overview:**\n"
-                "Based on the summaries of its compiled packages and dependencies (JARs), "
-                "describe the key libraries, frameworks, and external components the "
-                "project relies on. This is the context from its dependencies:\n"
-                f"[{class_context}]"
-            )
-        
-        prompt += "\n\nDo not respond with your reasoning process, only the two-paragraph summary."
-        return prompt
+        class_part = _PROJECT_CLASS_CONTEXT.format(class_context=class_context) if class_context else ""
+        return _PROJECT_SUMMARY.format(project_name=project_name, source_context=source_context, class_part=class_part)
 
     def get_iterative_project_summary_prompt(
         self,
@@ -253,23 +300,7 @@ Summary:
         """
         Generates a prompt for iteratively refining a project summary.
         """
-        if context_type == "source":
-            return (
-                f"The summary for the project '{project_name}' so far is: '{running_summary}'.\n"
-                "Here is a new chunk of context from its source code directories: "
-                f"[{context_chunk}].\n\n"
-                "Refine the 'Source Code Overview' paragraph of the summary based on this new information. "
-                "Provide a new, complete two-paragraph summary, enhancing the first paragraph and preserving the second if it exists. "
-                "Do not respond with your reasoning process, only the summary."
-            )
-        elif context_type == "class":
-            return (
-                f"The summary for the project '{project_name}' so far is: '{running_summary}'.\n"
-                "Here is a new chunk of context from its packages and dependencies: "
-                f"[{context_chunk}].\n\n"
-                "Add or refine the 'Package and Dependency Overview' paragraph of the summary based on this new information. "
-                "Provide a new, complete two-paragraph summary, preserving the first paragraph and enhancing the second. "
-                "Do not respond with your reasoning process, only the summary."
-            )
-        else:
+        template = _ITERATIVE_PROJECT_SUMMARY.get(context_type)
+        if template is None:
             raise ValueError(f"Unknown context_type for project summary: {context_type}")
+        return template.format(project_name=project_name, running_summary=running_summary, context_chunk=context_chunk)
@@ -4,9 +4,12 @@ from google.adk.tools.mcp_tool import StreamableHTTPConnectionParams, MCPToolset
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.llm_request import LlmRequest
 from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
 from google.genai import types
-from typing import Optional
+from typing import Any, Dict, Optional
 from pprint import pprint
+import json
 import os
 
 # --- Configuration ---
@@ -15,6 +18,11 @@ LLM_MODEL = LiteLlm(model="deepseek/deepseek-chat")
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 # LLM_MODEL = LiteLlm(model="openai/gpt-4o")
 
+# Tools whose response is fixed for the lifetime of the graph. Source code is left out
+# because the server re-reads edited files, and Cypher results depend on the query.
+CACHEABLE_TOOLS = frozenset({"get_graph_schema", "get_project_info"})
+TOOL_CACHE_STATE_PREFIX = "tool_cache:"
+
 def agent_guardrail(
     callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
     """A simple guardrail to intercept harmful language."""
@@ -32,6 +40,23 @@ def agent_guardrail(
                 )
     return None 
 
+def _tool_cache_key(tool: BaseTool, args: Dict[str, Any]) -> str:
+    return f"{TOOL_CACHE_STATE_PREFIX}{tool.name}:{json.dumps(args, sort_keys=True)}"
+
+def cached_tool_lookup(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext) -> Optional[Dict]:
+    """Answers a cacheable tool call from the session state, skipping the MCP round trip."""
+    if tool.name not in CACHEABLE_TOOLS:
+        return None
+    return tool_context.state.get(_tool_cache_key(tool, args))
+
+def cached_tool_store(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Dict) -> Optional[Dict]:
+    """Stores the response of a cacheable tool call in the session state."""
+    if tool.name in CACHEABLE_TOOLS and not (isinstance(tool_response, dict) and tool_response.get("isError")):
+        tool_context.state[_tool_cache_key(tool, args)] = tool_response
+    return None
+
 def sync_agent(): 
     connection_params = StreamableHTTPConnectionParams(url=MCP_URL)
     toolset = MCPToolset(connection_params=connection_params)
@@ -105,6 +130,8 @@ def sync_agent():
         tools=[toolset],
         output_key="last_response",
         before_model_callback=agent_guardrail,
+        before_tool_callback=cached_tool_lookup,
+        after_tool_callback=cached_tool_store,
     )
 
 
@@ -8,7 +8,7 @@ from directory_summarizer import DirectorySummarizer
 from package_summarizer import PackageSummarizer
 from project_summarizer import ProjectSummarizer
 from entity_embedder import EntityEmbedder
-from llm_client import get_llm_client, get_embedding_client, LlmClient, EmbeddingClient
+from llm_client import get_llm_client, close_llm_client, get_embedding_client, LlmClient, EmbeddingClient
 from summary_cache_manager import SummaryCacheManager
 from node_summary_processor import NodeSummaryProcessor
 from pathlib import Path
@@ -65,3 +65,5 @@ class RagOrchestrator:
         finally:
             # Ensure the cache is saved even if an error occurs
             self.cache_manager.save()
+            self.node_summary_processor.close()
+            close_llm_client(self.llm_client)
@@ -1,7 +1,8 @@
 import argparse
 import logging
 import sys
-from typing import List, Dict, Any
+from operator import itemgetter
+from typing import List, Dict, Any, Tuple
 from neo4j_manager import Neo4jManager
 from input_params import add_neo4j_args, add_logging_args
 from log_manager import init_logging
@@ -18,43 +19,49 @@ class SchemaAnalyzer:
         self.neo4j_manager = neo4j_manager
         logger.info("Initialized SchemaAnalyzer.")
 
-    def list_node_labels_and_counts(self) -> List[Dict[str, Any]]:
-        """Lists all node labels in the graph and their counts."""
+    def get_schema_counts(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Returns the node label counts and the relationship type counts, each sorted
+        by count descending, in one round trip. The counts come from the store's
+        count statistics via APOC, so no nodes or relationships are scanned.
+        """
         query = """
-        CALL db.labels() YIELD label
-        MATCH (n)
-        WHERE label IN labels(n)
-        RETURN label, count(n) AS count
-        ORDER BY count DESC
+        CALL apoc.meta.stats() YIELD labels, relTypesCount
+        RETURN
+            [label IN keys(labels) WHERE labels[label] > 0 | {label: label, count: labels[label]}] AS labelCounts,
+            [relType IN keys(relTypesCount) WHERE relTypesCount[relType] > 0 | {relationshipType: relType, count: relTypesCount[relType]}] AS relationshipCounts
         """
-        logger.info("Listing node labels and counts...")
-        return self.neo4j_manager.execute_read_query(query)
+        logger.info("Listing node labels and relationship types with their counts...")
+        result = self.neo4j_manager.execute_read_query(query)
+        if not result:
+            return [], []
+        by_count = itemgetter("count")
+        return (
+            sorted(result[0]["labelCounts"], key=by_count, reverse=True),
+            sorted(result[0]["relationshipCounts"], key=by_count, reverse=True),
+        )
+
+    def list_node_labels_and_counts(self) -> List[Dict[str, Any]]:
+        """Lists all node labels in the graph and their counts."""
+        return self.get_schema_counts()[0]
 
     def list_relationship_types_and_counts(self) -> List[Dict[str, Any]]:
         """Lists all relationship types in the graph and their counts."""
-        query = """
-        CALL db.relationshipTypes() YIELD relationshipType
-        MATCH ()-[r]->()
-        WHERE type(r) = relationshipType
-        RETURN relationshipType, count(r) AS count
-        ORDER BY count DESC
-        """
-        logger.info("Listing relationship types and counts...")
-        return self.neo4j_manager.execute_read_query(query)
+        return self.get_schema_counts()[1]
 
     def analyze_schema(self):
         """Executes all schema analysis queries and prints the results."""
         print("\n--- Starting jQAssistant Schema Analysis ---")
 
+        labels_counts, rel_counts = self.get_schema_counts()
+
         print("\nNode Labels and Counts:")
-        labels_counts = self.list_node_labels_and_counts()
         if not labels_counts:
             print("  No node labels found.")
         for item in labels_counts:
             print(f"  - {item['label']}: {item['count']}")
 
         print("\nRelationship Types and Counts:")
-        rel_counts = self.list_relationship_types_and_counts()
         if not rel_counts:
             print("  No relationship types found.")
         for item in rel_counts:
@@ -75,7 +82,8 @@ def main():
 
     try:
         with Neo4jManager(
-            uri=args.uri, user=args.user, password=args.password
+            uri=args.uri, user=args.user, password=args.password, database=args.database,
+            pool_size=args.pool_size, acq_timeout=args.acquisition_timeout, max_lifetime=args.max_lifetime
         ) as neo4j_mgr:
             if not neo4j_mgr.check_connection():
                 logger.critical("Failed to connect to Neo4j. Exiting.")
@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from tqdm import tqdm
 from pathlib import Path
@@ -6,6 +7,7 @@ from pathlib import Path
 from neo4j_manager import Neo4jManager
 from java_source_parser import JavaSourceParser
 from kotlin_source_parser import KotlinSourceParser
+from source_file_metadata import FileMetadata
 
 
 logger = logging.getLogger(__name__)
@@ -64,26 +66,34 @@ class SourceFileLinker:
         )
         logger.info("--- Finished Pass: Link Members to Source Files ---")
 
-    def _parse_source_files(self) -> List[Dict[str, Any]]:
+    def _parse_source_files(self) -> List[FileMetadata]:
         """
         Parses all Java and Kotlin files by querying Neo4j for their locations.
+        The two languages are independent, so they are parsed concurrently to
+        overlap one parser's file I/O with the other's parsing.
         """
-        all_source_metadata: List[Dict[str, Any]] = []
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            java_future = executor.submit(self._parse_java_files)
+            kotlin_future = executor.submit(self._parse_kotlin_files)
+            all_source_metadata: List[FileMetadata] = java_future.result() + kotlin_future.result()
 
+        return all_source_metadata
+
+    def _parse_java_files(self) -> List[FileMetadata]:
         java_parser = JavaSourceParser(self.neo4j_manager)
-        all_source_metadata.extend(java_parser.parse_project())
+        return java_parser.parse_project()
 
+    def _parse_kotlin_files(self) -> List[FileMetadata]:
         try:
             kotlin_parser = KotlinSourceParser(self.neo4j_manager)
-            all_source_metadata.extend(kotlin_parser.parse_project())
+            return kotlin_parser.parse_project()
         except ImportError as e:
             logger.warning(f"Kotlin parsing skipped: {e}")
         except Exception as e:
             logger.error(f"Error during Kotlin parsing: {e}")
+        return []
 
-        return all_source_metadata
-
-    def _enrich_graph_with_types(self, source_metadata: List[Dict[str, Any]]):
+    def _enrich_graph_with_types(self, source_metadata: List[FileMetadata]):
         """
         Connects :File nodes to :Type nodes based on parsed metadata.
         """
@@ -107,7 +117,7 @@ class SourceFileLinker:
             range(0, len(source_metadata), batch_size),
             desc="Enriching Neo4j graph with type links",
         ):
-            batch = source_metadata[i : i + batch_size]
+            batch = [meta.to_dict() for meta in source_metadata[i : i + batch_size]]
             try:
                 summary = self.neo4j_manager.execute_write_query(
                     cypher_query, params={"metadata": batch}
@@ -0,0 +1,21 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass(slots=True)
+class FileMetadata:
+    """
+    Metadata extracted from a single source file: its package and the FQNs of
+    the top-level types it declares.
+    """
+    path: str
+    package: str = ""
+    fqns: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the record as a plain dict, e.g. for Cypher query parameters."""
+        data = {"path": self.path, "package": self.package, "fqns": self.fqns}
+        if self.error is not None:
+            data["error"] = self.error
+        return data
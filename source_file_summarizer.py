@@ -39,7 +39,7 @@ class SourceFileSummarizer(BaseSummarizer):
     def _get_update_query(self) -> str:
         return """
         UNWIND $updates AS item
-        MATCH (sf:SourceFile {entity_id: item.id})
+        MATCH (sf:Entity:SourceFile {entity_id: item.id})
         SET sf.summary = item.summary
         """
 
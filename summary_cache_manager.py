@@ -3,7 +3,7 @@ import json
 import os
 import shutil
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Set
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +22,8 @@ class SummaryCacheManager:
 
         self.cache: Dict[str, Dict[str, Any]] = {}
         self.runtime_status: Dict[str, Dict[str, Any]] = {}
+        # Ids of the nodes regenerated during this run, kept in step with runtime_status
+        self.changed_ids: Set[str] = set()
         logger.info(f"Initialized SummaryCacheManager at {self.cache_dir}")
 
     def load(self):
@@ -94,6 +96,10 @@ class SummaryCacheManager:
     def get_node_cache(self, node_id: str) -> Dict[str, Any]:
         return self.cache.get(node_id, {})
 
+    def get_node_caches_batch(self, node_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Returns the cache entries of several nodes at once, keyed by node id."""
+        return {node_id: self.cache.get(node_id, {}) for node_id in node_ids}
+
     def update_node_cache(self, node_id: str, data: Dict[str, Any]):
         if node_id not in self.cache:
             self.cache[node_id] = {}
@@ -105,11 +111,17 @@ class SummaryCacheManager:
         
         if status == 'regenerated':
             self.runtime_status[node_id]['changed'] = True
+            self.changed_ids.add(node_id)
         # 'visited' can be added here if pruning is needed later
 
     def was_dependency_changed(self, dependency_ids: List[str]) -> bool:
         """Checks if any dependency node had its summary regenerated during this run."""
-        for dep_id in dependency_ids:
-            if self.runtime_status.get(dep_id, {}).get('changed', False):
-                return True
-        return False
+        return not self.changed_ids.isdisjoint(dependency_ids)
+
+    def was_any_dependency_changed_bulk(self, node_to_deps: Dict[str, List[str]]) -> Dict[str, bool]:
+        """
+        Checks was_dependency_changed for many nodes at once, returning
+        {node_id: is_stale}.
+        """
+        changed = self.changed_ids
+        return {node_id: not changed.isdisjoint(deps) for node_id, deps in node_to_deps.items()}
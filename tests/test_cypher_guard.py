@@ -0,0 +1,27 @@
+from cypher_guard import check_read_only_cypher
+
+
+def test_read_query_is_allowed():
+    assert check_read_only_cypher("MATCH (n:Method) RETURN n.name LIMIT 5") is None
+
+
+def test_write_query_is_rejected():
+    assert check_read_only_cypher("MATCH (n) DETACH DELETE n") == "Write operations are not allowed."
+
+
+def test_query_without_read_keyword_is_rejected():
+    assert check_read_only_cypher("CREATE (n:Pwn)") == "Query must contain a read-only keyword."
+
+
+def test_keywords_in_literals_and_comments_are_ignored():
+    assert check_read_only_cypher("MATCH (n) WHERE n.name = 'CREATE' RETURN n // SET") is None
+
+
+def test_quote_inside_backtick_identifier_does_not_hide_a_write():
+    query = "MATCH (n:`it's`) CREATE (m:Pwn) RETURN 'x'"
+    assert check_read_only_cypher(query) == "Write operations are not allowed."
+
+
+def test_escaped_backtick_inside_identifier():
+    assert check_read_only_cypher("MATCH (n:`a``b`) RETURN n") is None
+    assert check_read_only_cypher("MATCH (n:`a``'b`) SET n.x = 1 RETURN n") == "Write operations are not allowed."
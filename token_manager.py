@@ -1,3 +1,4 @@
+import functools
 import logging
 import re
 from typing import List, Optional
@@ -6,6 +7,10 @@ import tiktoken
 
 logger = logging.getLogger(__name__)
 
+# Summaries are counted again as they are folded into each parent's context,
+# so token counts are memoized per distinct text
+_TOKEN_COUNT_CACHE_SIZE = 100_000
+
 # Pre-compile the regex for finding special tokens
 _SPECIAL_PATTERN = re.compile(r"<\|[^|]+?\|>")
 
@@ -52,6 +57,10 @@ class TokenManager:
             )
             self.tokenizer = tiktoken.get_encoding("p50k_base")
 
+        self._cached_token_count = functools.lru_cache(
+            maxsize=_TOKEN_COUNT_CACHE_SIZE
+        )(self._count_tokens)
+
     def get_token_count(self, text: str) -> int:
         """
         Calculates the number of tokens in a given text.
@@ -60,6 +69,27 @@ class TokenManager:
         Returns:
             The number of tokens.
         """
+        return self._cached_token_count(text)
+
+    def get_total_token_count(self, *text_groups: List[str]) -> int:
+        """
+        Estimates the token count of all texts in the given lists joined by
+        single spaces, as the sum of their individual (memoized) counts plus
+        one per separator. Neither the joined string nor a combined list is
+        built.
+        Args:
+            text_groups: Lists of input strings, counted in order.
+        Returns:
+            The estimated number of tokens.
+        """
+        total = 0
+        num_texts = 0
+        for texts in text_groups:
+            num_texts += len(texts)
+            total += sum(self.get_token_count(text) for text in texts)
+        return total + num_texts - 1 if num_texts else 0
+
+    def _count_tokens(self, text: str) -> int:
         safe_text = _sanitize_special_tokens(text)
         return len(self.tokenizer.encode(safe_text))
 
@@ -159,11 +159,13 @@ class TypeSummarizer(BaseSummarizer):
     def _get_update_query(self) -> str:
         return """
         UNWIND $updates AS item
-        MATCH (t:Type)
-        WHERE t.entity_id = item.id
+        MATCH (t:Entity:Type {entity_id: item.id})
         SET t.summary = item.summary
         """
 
+    def _get_dependency_ids(self, item: Dict[str, Any]) -> Optional[List[str]]:
+        return item["parent_ids"] + item["member_ids"]
+
     def _prepare_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
         type_label_candidates = [
             label